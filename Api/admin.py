@@ -1,7 +1,35 @@
 from django.contrib import admin
-from . models import * 
+from core.paginators import EstimatedCountPaginator
+from .models import Review, StreamPlatform, WatchList
 
-# Register your models here.
-admin.site.register(WatchList)
-admin.site.register(StreamPlatform)
-admin.site.register(Review)
\ No newline at end of file
+
+@admin.register(StreamPlatform)
+class StreamPlatformAdmin(admin.ModelAdmin):
+    list_display = ('name', 'website')
+    # Case-sensitive prefix lookups (LIKE 'x%') can use the column's index, including the pattern-ops
+    # index Django adds on PostgreSQL; `^` would be istartswith, UPPER(col) LIKE 'X%', which cannot
+    search_fields = ('name__startswith',)
+    ordering = ('name',)
+
+
+@admin.register(WatchList)
+class WatchListAdmin(admin.ModelAdmin):
+    list_display = ('title', 'platform', 'active', 'avg_rating', 'number_rating', 'created')
+    list_select_related = ('platform',)
+    list_filter = ('active',)
+    search_fields = ('title__startswith',)
+    autocomplete_fields = ('platform',)
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+
+
+@admin.register(Review)
+class ReviewAdmin(admin.ModelAdmin):
+    list_display = ('id', 'rating', 'watchlist', 'review_user', 'active', 'created')
+    # __str__ reads both relations, so join them instead of querying per row
+    list_select_related = ('watchlist', 'review_user')
+    list_filter = ('active',)
+    search_fields = ('watchlist__title__startswith', 'review_user__email__startswith')
+    raw_id_fields = ('watchlist', 'review_user')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
@@ -1,6 +1,13 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class ApiConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "Api"
+
+    def ready(self):
+        from core.idempotency import check_idempotency_store
+        from . import signals  # noqa: F401
+
+        checks.register(check_idempotency_store, checks.Tags.caches, deploy=True)
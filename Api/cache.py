@@ -0,0 +1,253 @@
+"""
+Cached catalogue payloads: serialized responses of the hottest reads.
+
+Every payload key carries a generation: the listings share one counter and each title has
+its own. Writes bump the counters of the payloads they affect, from the same signals and
+`record_changes` calls that feed the change log, once right away and again on commit. A
+fill reads the generation before it reads the rows, so a fill that raced a write stores
+its payload under a generation nobody reads any more instead of putting the old rows back.
+Payloads of old generations expire after CATALOGUE_CACHE_TIMEOUT seconds. `manage.py
+warm_cache` fills them after a deploy.
+
+Caching is off unless the default cache is shared by every worker (see CATALOGUE_CACHE):
+invalidation only reaches the cache it runs against, so with a per-process cache the other
+workers would keep serving stale payloads until they expire.
+
+Review pages are versioned the same way, per title, so invalidating them is one increment
+however many pages were cached. Author renames are not tracked and show up when the pages
+expire.
+"""
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.caching import cache_is_shared, single_flight, single_flight_many
+from .models import Review, StreamPlatform, WatchList
+
+PLATFORM_LIST_KEY = 'catalogue:platforms'
+PLATFORM_SUMMARY_KEY = 'catalogue:platforms:summary'
+TITLE_LIST_KEY = 'catalogue:titles'
+LISTING_KEYS = (PLATFORM_LIST_KEY, PLATFORM_SUMMARY_KEY, TITLE_LIST_KEY)
+LISTINGS_GENERATION_KEY = 'catalogue:listings:generation'
+
+
+def caching_enabled():
+    """
+    Returns whether payloads are cached: CATALOGUE_CACHE when set, otherwise whether the default cache is shared.
+    """
+    if settings.CATALOGUE_CACHE is not None:
+        return settings.CATALOGUE_CACHE
+    return cache_is_shared()
+
+
+def generation(key):
+    """
+    Returns the current value of the generation counter stored under `key`.
+
+    A missing counter starts from the current time in nanoseconds rather than 1, so a counter
+    evicted from the cache never comes back to a generation whose payloads may still be cached.
+    """
+    value = cache.get(key)
+    if value is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        value = cache.get(key)
+    return value
+
+
+def bump_generations(keys):
+    """
+    Increments the given generation counters, once now and again when the transaction commits.
+
+    The first bump stops fills that start during the transaction from being read back; the
+    second stops those that read the rows before the commit.
+    """
+    if not caching_enabled():
+        return
+    keys = list(dict.fromkeys(keys))
+
+    def bump():
+        for key in keys:
+            try:
+                cache.incr(key)
+            except ValueError:
+                # No counter yet: the next read starts a fresh one
+                pass
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def title_generation_key(pk):
+    return f"catalogue:title:{pk}:generation"
+
+
+def title_keys(ids):
+    """
+    Returns {pk: cache key} for the current generation of each title, reading the counters in one round-trip.
+    """
+    generation_keys = {pk: title_generation_key(pk) for pk in ids}
+    generations = cache.get_many(list(generation_keys.values()))
+    return {
+        pk: f"catalogue:title:{pk}:g{generations.get(key) or generation(key)}"
+        for pk, key in generation_keys.items()
+    }
+
+
+def title_key(pk):
+    return title_keys([pk])[pk]
+
+
+def listing_key(name):
+    return f"{name}:g{generation(LISTINGS_GENERATION_KEY)}"
+
+
+def reviews_version_key(watchlist_id):
+    return f"reviews:version:{watchlist_id}"
+
+
+def reviews_version(watchlist_id):
+    """
+    Returns the current version of a title's review pages.
+    """
+    return generation(reviews_version_key(watchlist_id))
+
+
+def review_page_key(watchlist_id, page_params):
+    """
+    Returns the cache key of one page of a title's reviews; pages differ by the parameters that select them.
+    """
+    query = urlencode(sorted(page_params.items()))
+    return f"reviews:{watchlist_id}:v{reviews_version(watchlist_id)}:{query}"
+
+
+def cached_review_page(watchlist_id, page_params, build):
+    """
+    Returns one page of a title's reviews from the cache, building it once per review version.
+
+    The version counters live in the same cache as the pages, so without a shared cache both
+    are skipped and the page is built on every call.
+
+    Parameters:
+    watchlist_id (int): The primary key of the WatchList object.
+    page_params (dict): The query parameters that select the page; any other parameter must not change it.
+    build (callable): Builds the page payload; called without arguments.
+
+    Returns:
+    object: The page payload.
+    """
+    if not caching_enabled():
+        return build()
+    return cached_payload(review_page_key(watchlist_id, page_params), build)
+
+
+def cached_payload(key, build):
+    """
+    Returns the payload stored under `key`, building it once on a miss (see core.caching.single_flight).
+    Without caching, the payload is built on every call.
+    """
+    if not caching_enabled():
+        return build()
+    return single_flight(key, build, settings.CATALOGUE_CACHE_TIMEOUT)
+
+
+def cached_listing(name, build):
+    """
+    Returns one of the LISTING_KEYS payloads, building it once per listings generation.
+    """
+    if not caching_enabled():
+        return build()
+    return cached_payload(listing_key(name), build)
+
+
+def cached_title(pk, build):
+    """
+    Returns a title's payload, building it once per title generation; None (no such title) is not cached.
+    """
+    if not caching_enabled():
+        return build()
+    return cached_payload(title_key(pk), build)
+
+
+def cached_titles(ids, build_many):
+    """
+    Returns title payloads from the per-title cache, building all misses with one call.
+
+    Misses are filled under per-title locks (see core.caching.single_flight_many), so
+    concurrent batch and detail reads of the same title build it once.
+
+    Parameters:
+    ids (list): The WatchList primary keys to return.
+    build_many (callable): Takes the missing ids and returns a {pk: payload} dict of those that exist.
+
+    Returns:
+    dict: {pk: payload} for the ids that exist.
+    """
+    if not caching_enabled():
+        return build_many(ids)
+    # Generations are read before anything is built, like in cached_title
+    keys = {key: pk for pk, key in title_keys(ids).items()}
+
+    def build_keys(missing_keys):
+        built = build_many([keys[key] for key in missing_keys])
+        return {key: built.get(keys[key]) for key in missing_keys}
+
+    found = single_flight_many(list(keys), build_keys, settings.CATALOGUE_CACHE_TIMEOUT)
+    return {keys[key]: payload for key, payload in found.items() if payload is not None}
+
+
+def refresh_listing(name, build):
+    """
+    Builds a listing and stores it for the current generation, replacing any cached copy.
+    """
+    key = listing_key(name)
+    cache.set(key, build(), timeout=settings.CATALOGUE_CACHE_TIMEOUT)
+
+
+def refresh_titles(ids, build_many):
+    """
+    Builds the given titles and stores them for their current generations.
+    """
+    keys = title_keys(ids)
+    payloads = build_many(ids)
+    cache.set_many({keys[pk]: payload for pk, payload in payloads.items()}, timeout=settings.CATALOGUE_CACHE_TIMEOUT)
+
+
+def invalidate_titles(title_ids):
+    """
+    Retires the listings and the given titles' payloads by bumping their generations.
+
+    Parameters:
+    title_ids (iterable): The primary keys of the WatchList payloads to retire.
+
+    Returns:
+    None
+    """
+    bump_generations([LISTINGS_GENERATION_KEY, *(title_generation_key(pk) for pk in title_ids)])
+
+
+def bump_review_versions(watchlist_ids):
+    """
+    Moves the given titles' review pages to a new version, once now and again on commit.
+
+    Parameters:
+    watchlist_ids (iterable): The primary keys of the WatchList objects whose reviews changed.
+
+    Returns:
+    None
+    """
+    bump_generations(reviews_version_key(pk) for pk in watchlist_ids)
+
+
+def affected_titles(model, object_ids):
+    """
+    Returns the ids of the titles whose payloads embed the given platforms, titles or reviews.
+    """
+    if model is StreamPlatform:
+        # Title payloads carry their platform's name
+        return list(WatchList.objects.filter(platform__in=object_ids).values_list('pk', flat=True))
+    if model is Review:
+        return list(Review.objects.filter(pk__in=object_ids).values_list('watchlist_id', flat=True).distinct())
+    return list(object_ids)
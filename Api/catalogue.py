@@ -0,0 +1,193 @@
+"""
+Streaming readers and batched upserts used by `manage.py import_catalogue`.
+"""
+import csv
+import json
+import logging
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import Review, StreamPlatform, WatchList
+from .signals import record_changes
+
+logger = logging.getLogger(__name__)
+
+READ_SIZE = 64 * 1024
+TRUE_VALUES = ('1', 'true', 'yes')
+
+
+def _iter_json_array(handle):
+    """
+    Yields the items of a top-level JSON array without parsing the whole file at once.
+    """
+    decoder = json.JSONDecoder()
+    buffer = handle.read(READ_SIZE).lstrip()
+    if not buffer.startswith('['):
+        raise ValueError("JSON catalogue files must contain a top-level array")
+    buffer = buffer[1:]
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = handle.read(READ_SIZE)
+            if not chunk:
+                raise
+            buffer += chunk
+            continue
+        yield item
+        buffer = buffer[end:]
+        if len(buffer) < READ_SIZE:
+            buffer += handle.read(READ_SIZE)
+
+
+def read_records(path):
+    """
+    Streams records from a CSV, JSON (array) or JSON Lines file, chosen by extension.
+
+    Parameters:
+    path (str): The file to read.
+
+    Returns:
+    iterator: One dict per record.
+    """
+    suffix = Path(path).suffix.lower()
+    with open(path, newline='', encoding='utf-8') as handle:
+        if suffix == '.csv':
+            yield from csv.DictReader(handle)
+        elif suffix in ('.jsonl', '.ndjson'):
+            for line in handle:
+                if line.strip():
+                    yield json.loads(line)
+        elif suffix == '.json':
+            yield from _iter_json_array(handle)
+        else:
+            raise ValueError(f"Unsupported catalogue file type: {path}")
+
+
+def batched(records, batch_size):
+    records = iter(records)
+    while batch := list(islice(records, batch_size)):
+        yield batch
+
+
+def _flag(value, default=True):
+    if value is None or value == '':
+        return default
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in TRUE_VALUES
+
+
+def _record_upserted(model, objects):
+    # bulk_create skips post_save, so feed the change log directly
+    record_changes(model, [obj.pk for obj in objects if obj.pk is not None])
+
+
+def upsert_platforms(records):
+    """
+    Inserts or updates a batch of platforms keyed by name.
+
+    Returns:
+    int: The number of records written.
+    """
+    platforms = {
+        record['name']: StreamPlatform(name=record['name'], about=record.get('about', ''), website=record.get('website', ''))
+        for record in records
+    }
+    with transaction.atomic():
+        created = StreamPlatform.objects.bulk_create(
+            platforms.values(), update_conflicts=True, unique_fields=['name'], update_fields=['about', 'website'],
+        )
+        _record_upserted(StreamPlatform, created)
+    return len(platforms)
+
+
+def upsert_titles(records):
+    """
+    Inserts or updates a batch of titles keyed by (platform name, title); unknown platforms are skipped.
+
+    Returns:
+    tuple: The number of records written and the number skipped.
+    """
+    platform_ids = dict(
+        StreamPlatform.objects.filter(name__in={record['platform'] for record in records}).values_list('name', 'pk')
+    )
+    titles = {}
+    for record in records:
+        platform_id = platform_ids.get(record['platform'])
+        if platform_id is None:
+            continue
+        titles[(platform_id, record['title'])] = WatchList(
+            platform_id=platform_id, title=record['title'],
+            description=record.get('description', ''), active=_flag(record.get('active')),
+        )
+    with transaction.atomic():
+        created = WatchList.objects.bulk_create(
+            titles.values(), update_conflicts=True, unique_fields=['platform', 'title'],
+            update_fields=['description', 'active'],
+        )
+        _record_upserted(WatchList, created)
+    return len(titles), len(records) - len(titles)
+
+
+def upsert_reviews(records):
+    """
+    Inserts or updates a batch of reviews keyed by (title, reviewer email); rows whose platform,
+    title or reviewer does not exist are skipped, and so are rows whose rating fails the model's
+    validators, which bulk writes do not run. Rating aggregates are left to the caller.
+
+    A record updates its reviewer's active review of the title, or adds a new one when there is
+    none; soft-deleted reviews are left alone.
+
+    Returns:
+    tuple: The number of records written, the number skipped and the ids of the titles touched.
+    """
+    User = get_user_model()
+    user_ids = dict(
+        User.objects.filter(email__in={record['reviewer_email'] for record in records}).values_list('email', 'pk')
+    )
+    keys = {(record['platform'], record['title']) for record in records}
+    watchlist_ids = {
+        (platform, title): pk
+        for pk, platform, title in WatchList.objects.filter(
+            platform__name__in={platform for platform, _ in keys}, title__in={title for _, title in keys},
+        ).values_list('pk', 'platform__name', 'title')
+    }
+    rating_field = Review._meta.get_field('rating')
+    reviews = {}
+    for record in records:
+        watchlist_id = watchlist_ids.get((record['platform'], record['title']))
+        user_id = user_ids.get(record['reviewer_email'])
+        if watchlist_id is None or user_id is None:
+            continue
+        try:
+            rating = rating_field.clean(record.get('rating'), None)
+        except ValidationError as exc:
+            logger.warning(
+                "Skipping review of %s by %s: %s", record['title'], record['reviewer_email'], "; ".join(exc.messages),
+            )
+            continue
+        reviews[(watchlist_id, user_id)] = Review(
+            watchlist_id=watchlist_id, review_user_id=user_id, rating=rating,
+            description=record.get('description', ''), active=_flag(record.get('active')),
+        )
+    # The unique constraint only covers active reviews, so it cannot be an ON CONFLICT target
+    existing = Review.active_objects.filter(
+        watchlist__in={watchlist_id for watchlist_id, _ in reviews}, review_user__in={user_id for _, user_id in reviews},
+    ).values_list('watchlist', 'review_user', 'pk')
+    for watchlist_id, user_id, pk in existing:
+        if (watchlist_id, user_id) in reviews:
+            reviews[(watchlist_id, user_id)].pk = pk
+    updated = [review for review in reviews.values() if review.pk is not None]
+    with transaction.atomic():
+        Review.objects.bulk_update(updated, ['rating', 'description', 'active'])
+        created = Review.objects.bulk_create([review for review in reviews.values() if review.pk is None])
+        _record_upserted(Review, [*updated, *created])
+    return len(reviews), len(records) - len(reviews), {watchlist_id for watchlist_id, _ in reviews}
@@ -0,0 +1,129 @@
+"""
+Pub/sub of review events for the server-sent events stream.
+
+The backend is chosen by the REVIEW_EVENTS_BACKEND setting. The default broker keeps
+subscribers in this process, which is enough for a single ASGI worker; `manage.py serve --asgi`
+and the gunicorn master refuse to start several workers with it (see check_workers), since a
+review published by one worker would never reach the streams held by the others. A shared
+backend only has to provide the same `subscribe`/`unsubscribe`/`publish` methods, deliver
+published messages to the subscriptions of every process and leave `shared` true.
+"""
+import asyncio
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.utils.module_loading import import_string
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def watchlist_channel(watchlist_id):
+    return f"watchlist:{watchlist_id}"
+
+
+class Subscription:
+    """
+    A bounded per-connection buffer; when a slow client falls behind the oldest events are dropped.
+    """
+
+    def __init__(self, channel, maxsize):
+        self.channel = channel
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.loop = asyncio.get_running_loop()
+        self.dropped = 0
+
+    def push(self, message):
+        """
+        Hands a message to the subscriber's event loop; safe to call from any thread.
+        """
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The connection's loop is already closed
+            pass
+
+    def _put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        """
+        Waits for the next message.
+
+        Parameters:
+        timeout (float): Seconds to wait before giving up.
+
+        Returns:
+        str: The message, or None if the timeout elapsed first.
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+
+class InProcessBroker:
+    """
+    Delivers published messages to the subscribers of the current process.
+    """
+    # Subscribers only see what their own process publishes
+    shared = False
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel, maxsize):
+        subscription = Subscription(channel, maxsize)
+        with self._lock:
+            self._subscribers[channel].add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def publish(self, channel, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.push(message)
+
+
+def get_broker():
+    """
+    Returns the process-wide broker configured by REVIEW_EVENTS_BACKEND.
+    """
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                _broker = import_string(settings.REVIEW_EVENTS_BACKEND)()
+    return _broker
+
+
+def check_workers(workers):
+    """
+    Refuses to serve the review streams from several processes through a broker that cannot reach them all.
+
+    Parameters:
+    workers (int): Number of ASGI worker processes about to be started.
+
+    Raises:
+    ImproperlyConfigured: If there is more than one worker and REVIEW_EVENTS_BACKEND is not shared.
+    """
+    backend = import_string(settings.REVIEW_EVENTS_BACKEND)
+    if workers > 1 and not getattr(backend, 'shared', True):
+        raise ImproperlyConfigured(
+            f"{settings.REVIEW_EVENTS_BACKEND} only delivers review events within one process; serve the "
+            f"ASGI app with a single worker or set REVIEW_EVENTS_BACKEND to a shared broker ({workers} workers requested)."
+        )
@@ -0,0 +1,46 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from Api.models import ChangeLogEntry
+
+
+class Command(BaseCommand):
+    """
+    Compacts the change feed so it grows with the catalogue rather than with its write history.
+
+    Only the newest entry per object is kept, which is all a consumer needs to converge, and
+    delete markers are dropped once they are older than the tombstone retention. Consumers
+    must sync more often than that retention to be sure to see every delete.
+    """
+    help = "Drop superseded change-feed entries and expired delete markers."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tombstone-days', type=int, default=7)
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        newer = ChangeLogEntry.objects.filter(
+            entity=OuterRef('entity'), object_id=OuterRef('object_id'), pk__gt=OuterRef('pk')
+        )
+        superseded = self.delete_in_batches(
+            ChangeLogEntry.objects.filter(Exists(newer)), options['batch_size']
+        )
+        cutoff = timezone.now() - timedelta(days=options['tombstone_days'])
+        tombstones = self.delete_in_batches(
+            ChangeLogEntry.objects.filter(action=ChangeLogEntry.DELETE, created__lt=cutoff), options['batch_size']
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f"Removed {superseded} superseded entries and {tombstones} expired delete markers."
+        ))
+
+    def delete_in_batches(self, queryset, batch_size):
+        removed = 0
+        while True:
+            ids = list(queryset.order_by('pk').values_list('pk', flat=True)[:batch_size])
+            if not ids:
+                return removed
+            ChangeLogEntry.objects.filter(pk__in=ids).delete()
+            removed += len(ids)
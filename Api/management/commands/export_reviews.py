@@ -0,0 +1,37 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Api.exports import EXPORT_FORMATS, export_stream, parse_bound
+
+
+class Command(BaseCommand):
+    """
+    Streams every review, joined with its title, platform and reviewer email, to a file or stdout.
+    """
+    help = "Export reviews as CSV or NDJSON in constant memory."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', dest='export_format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--since', help="Only reviews created at or after this ISO date/datetime.")
+        parser.add_argument('--until', help="Only reviews created before this ISO date/datetime.")
+        parser.add_argument('--gzip', action='store_true', help="Gzip the output.")
+        parser.add_argument('--output', '-o', help="File to write; defaults to stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_bound(options['since']) if options['since'] else None
+            until = parse_bound(options['until']) if options['until'] else None
+        except ValueError as exc:
+            raise CommandError(exc)
+
+        chunks = export_stream(options['export_format'], since, until, compress=options['gzip'])
+        if options['output']:
+            with open(options['output'], 'wb') as output:
+                for chunk in chunks:
+                    output.write(chunk)
+        else:
+            output = sys.stdout.buffer
+            for chunk in chunks:
+                output.write(chunk)
+            output.flush()
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from core.schema import measure_latency, write_schema
+
+
+class Command(BaseCommand):
+    """
+    Writes the precomputed OpenAPI schema served at /swagger.json.
+
+    Run it during deploys so the first request does not pay for generation.
+    """
+    help = "Generate the versioned OpenAPI schema file."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate even if the current version exists.")
+        parser.add_argument('--benchmark', type=int, metavar='N', help="Time N generated vs precomputed schema requests.")
+
+    def handle(self, *args, **options):
+        fingerprint, path = write_schema(force=options['force'])
+        self.stdout.write(self.style.SUCCESS(f"Schema {fingerprint} written to {path}"))
+
+        if options['benchmark']:
+            timings = measure_latency(options['benchmark'])
+            self.stdout.write(
+                f"Generated per request: {timings['generated_ms']:.2f} ms, "
+                f"precomputed: {timings['precomputed_ms']:.2f} ms"
+            )
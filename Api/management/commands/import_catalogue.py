@@ -0,0 +1,64 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from Api.catalogue import batched, read_records, upsert_platforms, upsert_reviews, upsert_titles
+from Api.models import WatchList
+from Api.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    """
+    Loads platforms, titles and reviews from CSV, JSON or JSON Lines files.
+
+    Files are streamed and written in batches, one transaction per batch. Platforms are
+    upserted by name, titles by (platform, title) and reviews by (title, reviewer email);
+    rating aggregates of the touched titles are recomputed once at the end.
+    """
+    help = "Bulk import catalogue files (CSV/JSON/JSONL)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--platforms', help="Records with name, about, website.")
+        parser.add_argument('--titles', help="Records with platform, title, description[, active].")
+        parser.add_argument('--reviews', help="Records with platform, title, reviewer_email, rating, description[, active].")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if not any(options[name] for name in ('platforms', 'titles', 'reviews')):
+            raise CommandError("Pass at least one of --platforms, --titles or --reviews.")
+
+        touched = set()
+        if options['platforms']:
+            self.run('platforms', options['platforms'], options['batch_size'], lambda batch: (upsert_platforms(batch), 0))
+        if options['titles']:
+            self.run('titles', options['titles'], options['batch_size'], upsert_titles)
+        if options['reviews']:
+            def upsert(batch):
+                written, skipped, watchlist_ids = upsert_reviews(batch)
+                touched.update(watchlist_ids)
+                return written, skipped
+            self.run('reviews', options['reviews'], options['batch_size'], upsert)
+
+        if touched:
+            checked = changed = 0
+            for ids in batched(sorted(touched), options['batch_size']):
+                batch_checked, drift = recompute_ratings(WatchList.objects.filter(pk__in=ids))
+                checked += batch_checked
+                changed += len(drift)
+            self.stdout.write(f"ratings: recomputed {checked} titles, {changed} changed")
+
+    def run(self, label, path, batch_size, upsert):
+        start = time.perf_counter()
+        written = skipped = 0
+        try:
+            for batch in batched(read_records(path), batch_size):
+                batch_written, batch_skipped = upsert(batch)
+                written += batch_written
+                skipped += batch_skipped
+        except (OSError, ValueError, KeyError) as exc:
+            raise CommandError(f"{label}: {exc!r}")
+        elapsed = time.perf_counter() - start
+        rate = written / elapsed if elapsed else 0
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}: {written} upserted, {skipped} skipped in {elapsed:.2f}s ({rate:.0f} rows/s)"
+        ))
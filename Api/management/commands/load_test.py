@@ -0,0 +1,155 @@
+import http.client
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from Api.models import WatchList
+from .seed_perf import PERF_PASSWORD
+
+# Scenario name -> relative weight in the traffic mix
+TRAFFIC_MIX = {
+    'browse_platforms': 20,
+    'open_title': 35,
+    'read_reviews': 30,
+    'login': 10,
+    'post_review': 5,
+}
+
+
+class VirtualUser:
+    """
+    One simulated client with a keep-alive connection and its own access token.
+    """
+
+    def __init__(self, base_url, email, title_ids, rng):
+        parts = urlsplit(base_url)
+        self.host, self.port = parts.hostname, parts.port or 80
+        self.prefix = parts.path.rstrip('/')
+        self.email = email
+        self.title_ids = title_ids
+        self.rng = rng
+        self.token = None
+        self.connection = None
+
+    def request(self, method, path, body=None):
+        headers = {'Content-Type': 'application/json'}
+        if self.token:
+            headers['Authorization'] = f'Bearer {self.token}'
+        payload = json.dumps(body) if body is not None else None
+        for attempt in range(2):
+            if self.connection is None:
+                self.connection = http.client.HTTPConnection(self.host, self.port, timeout=30)
+            try:
+                self.connection.request(method, self.prefix + path, body=payload, headers=headers)
+                response = self.connection.getresponse()
+                return response.status, response.read()
+            except (http.client.HTTPException, OSError):
+                self.connection.close()
+                self.connection = None
+                if attempt:
+                    raise
+
+    def browse_platforms(self):
+        return self.request('GET', '/api/v1/stream/')
+
+    def open_title(self):
+        return self.request('GET', f'/api/v1/watchlist/{self.rng.choice(self.title_ids)}/')
+
+    def read_reviews(self):
+        return self.request('GET', f'/api/v1/stream/{self.rng.choice(self.title_ids)}/review/')
+
+    def login(self):
+        status, body = self.request('POST', '/api/v1/login/', {'email': self.email, 'password': PERF_PASSWORD})
+        if status == 200:
+            self.token = json.loads(body)['tokens']['access']
+        return status, body
+
+    def post_review(self):
+        if not self.token:
+            return self.login()
+        return self.request('POST', f'/api/v1/{self.rng.choice(self.title_ids)}/review-create/', {
+            'rating': self.rng.randint(1, 5), 'description': "Load test review",
+        })
+
+
+def percentile(sorted_values, fraction):
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method='inclusive')[int(fraction * 100) - 1]
+
+
+class Command(BaseCommand):
+    """
+    Replays our traffic mix against a running server and reports throughput and latency per scenario.
+
+    Seed the database first with `manage.py seed_perf` and start the server (runserver,
+    gunicorn or uvicorn) on the same database. Anonymous requests are throttled by
+    DEFAULT_THROTTLE_RATES, so raise THROTTLE_ANON_RATE/THROTTLE_USER_RATE on the server
+    or expect 429s in the status breakdown.
+    """
+    help = "Run the load-test scenario pack against a local server."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000')
+        parser.add_argument('--concurrency', type=int, default=10)
+        parser.add_argument('--duration', type=float, default=30, help="Seconds to run.")
+        parser.add_argument('--prefix', default='perf', help="Prefix used by seed_perf.")
+        parser.add_argument('--seed', type=int, default=1)
+
+    def handle(self, *args, **options):
+        title_ids = list(WatchList.active_objects.values_list('pk', flat=True)[:10000])
+        emails = list(
+            get_user_model().objects.filter(email__startswith=f"{options['prefix']}-user-")
+            .values_list('email', flat=True)[:options['concurrency']]
+        )
+        if not title_ids or not emails:
+            raise CommandError("No seeded data found; run `manage.py seed_perf` first.")
+
+        samples = defaultdict(list)
+        statuses = defaultdict(lambda: defaultdict(int))
+        lock = threading.Lock()
+        scenarios, weights = zip(*TRAFFIC_MIX.items())
+        deadline = time.monotonic() + options['duration']
+
+        def worker(index):
+            rng = random.Random(options['seed'] + index)
+            user = VirtualUser(options['url'], emails[index % len(emails)], title_ids, rng)
+            while time.monotonic() < deadline:
+                scenario = rng.choices(scenarios, weights)[0]
+                start = time.perf_counter()
+                try:
+                    status, _ = getattr(user, scenario)()
+                except (http.client.HTTPException, OSError):
+                    status = 'error'
+                    time.sleep(0.1)
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    samples[scenario].append(elapsed)
+                    statuses[scenario][status] += 1
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=options['concurrency']) as pool:
+            list(pool.map(worker, range(options['concurrency'])))
+        wall = time.monotonic() - started
+
+        self.stdout.write(f"{'scenario':<18} {'reqs':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+        for scenario in scenarios:
+            latencies = sorted(samples[scenario])
+            if not latencies:
+                continue
+            breakdown = ' '.join(f"{status}:{count}" for status, count in sorted(statuses[scenario].items(), key=str))
+            self.stdout.write(
+                f"{scenario:<18} {len(latencies):>7} {len(latencies) / wall:>8.1f} "
+                f"{percentile(latencies, 0.50):>8.1f} {percentile(latencies, 0.95):>8.1f} "
+                f"{percentile(latencies, 0.99):>8.1f}  {breakdown}"
+            )
+        total = sum(len(values) for values in samples.values())
+        self.stdout.write(self.style.SUCCESS(f"{total} requests in {wall:.1f}s ({total / wall:.1f} req/s)"))
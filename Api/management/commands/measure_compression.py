@@ -0,0 +1,47 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+
+from core.middleware import brotli
+
+DEFAULT_PATHS = ['/api/v1/stream/', '/api/v1/watchlist/']
+
+
+class Command(BaseCommand):
+    """
+    Measures bytes on the wire and compression CPU cost for API endpoints.
+
+    Each path is fetched uncompressed from the current database, then compressed with
+    gzip and, when installed, brotli, to help pick COMPRESSION_MIN_SIZE and BROTLI_QUALITY.
+    """
+    help = "Report raw vs compressed response sizes and compression time per endpoint."
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=DEFAULT_PATHS)
+        parser.add_argument('--repeat', type=int, default=5, help="Compressions averaged per measurement.")
+
+    def handle(self, *args, **options):
+        codecs = [('gzip-6', lambda data: gzip.compress(data, compresslevel=6, mtime=0))]
+        if brotli is not None:
+            codecs += [
+                (f'br-{quality}', lambda data, quality=quality: brotli.compress(data, quality=quality))
+                for quality in (4, 11)
+            ]
+
+        client = Client()
+        self.stdout.write(f"{'path':<30} {'codec':<8} {'raw B':>10} {'wire B':>10} {'ratio':>6} {'CPU ms':>8}")
+        with override_settings(ALLOWED_HOSTS=['testserver']):
+            for path in options['paths']:
+                response = client.get(path, HTTP_ACCEPT_ENCODING='identity')
+                body = b''.join(response.streaming_content) if response.streaming else response.content
+                for name, compress in codecs:
+                    start = time.process_time()
+                    for _ in range(options['repeat']):
+                        compressed = compress(body)
+                    cpu_ms = (time.process_time() - start) * 1000 / options['repeat']
+                    ratio = len(compressed) / len(body) if body else 1
+                    self.stdout.write(
+                        f"{path:<30} {name:<8} {len(body):>10} {len(compressed):>10} {ratio:>6.2f} {cpu_ms:>8.2f}"
+                    )
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+# Mirrors what a worker does before it can serve its first request
+STARTUP_SCRIPT = "import django; django.setup(); import {urlconf}"
+
+
+def parse_importtime(output):
+    """
+    Parses the stderr of `python -X importtime` into per-module timings.
+
+    Parameters:
+    output (str): The raw importtime report.
+
+    Returns:
+    list: (module, self_us, cumulative_us) tuples in import order.
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, module = line[len('import time:'):].split('|')
+        rows.append((module.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+class Command(BaseCommand):
+    """
+    Reports the modules that cost the most to import when a worker starts.
+
+    The startup is replayed in a fresh interpreter under `python -X importtime`, so the
+    numbers are not skewed by modules the management command itself has already loaded.
+    """
+    help = "Profile import time of the project on startup."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--settings-module', default=os.environ.get('DJANGO_SETTINGS_MODULE', 'core.settings'))
+        parser.add_argument('--urlconf', default='core.urls')
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--sort', choices=['self', 'cumulative'], default='cumulative')
+
+    def handle(self, *args, **options):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=options['settings_module'])
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', STARTUP_SCRIPT.format(urlconf=options['urlconf'])],
+            capture_output=True, text=True, env=env,
+        )
+        rows = parse_importtime(result.stderr)
+        if result.returncode != 0 or not rows:
+            raise CommandError(result.stderr[-2000:])
+
+        total_us = sum(self_us for _, self_us, _ in rows)
+        key = 1 if options['sort'] == 'self' else 2
+        self.stdout.write(f"{'self ms':>9} {'cumul ms':>9}  module")
+        for module, self_us, cumulative_us in sorted(rows, key=lambda row: row[key], reverse=True)[:options['top']]:
+            self.stdout.write(f"{self_us / 1000:9.1f} {cumulative_us / 1000:9.1f}  {module}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(rows)} modules imported in {total_us / 1000:.1f} ms with {options['settings_module']}"
+        ))
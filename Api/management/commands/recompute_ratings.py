@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from Api.models import ChangeLogEntry, Review, WatchList
+from Api.ratings import recompute_ratings
+
+
+class Command(BaseCommand):
+    """
+    Recomputes WatchList rating aggregates from the active reviews and reports any drift.
+
+    Meant to be run on a schedule; pass the watermark printed by the previous run as
+    `--since` to only revisit titles touched after it. Touched titles come from the change
+    log, which records every review save, soft delete and hard delete, bulk writes included.
+    A hard-deleted review no longer says which title it belonged to, so any such entry makes
+    the run recompute every title. Schedule it more often than `compact_changelog` drops
+    delete markers (--tombstone-days).
+
+    The watermark trails the start of the run by CHANGE_FEED_SAFETY_LAG, as the change feed
+    does: a change log entry is stamped when it is inserted, so a write still committing when
+    the run started may carry an earlier timestamp than changes the run already saw. Titles
+    changed inside that lag are simply checked again by the next run.
+    """
+    help = "Recompute WatchList.avg_rating and number_rating from active reviews."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help="Only recompute titles whose row or reviews changed after this ISO datetime.")
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="Report drift without writing it.")
+
+    def handle(self, *args, **options):
+        watermark = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_SAFETY_LAG)
+        queryset = WatchList.objects.all()
+
+        if options['since']:
+            since = parse_datetime(options['since'])
+            if since is None:
+                raise CommandError(f"Invalid --since value: {options['since']}")
+            if timezone.is_naive(since):
+                since = timezone.make_aware(since)
+            changes = ChangeLogEntry.objects.filter(created__gte=since)
+            changed_reviews = changes.filter(entity='review').values('object_id')
+            if changed_reviews.exclude(object_id__in=Review.objects.values('pk')).exists():
+                self.stdout.write("Reviews were deleted since the watermark; recomputing every title.")
+            else:
+                touched = Review.objects.filter(pk__in=changed_reviews).values('watchlist')
+                queryset = queryset.filter(
+                    Q(pk__in=changes.filter(entity='watchlist').values('object_id')) | Q(pk__in=touched)
+                )
+
+        checked, drift = recompute_ratings(queryset, batch_size=options['batch_size'], dry_run=options['dry_run'])
+
+        for pk, old, new in drift:
+            self.stdout.write(f"WatchList {pk}: avg {old[0]} -> {new[0]}, count {old[1]} -> {new[1]}")
+        action = "found" if options['dry_run'] else "fixed"
+        self.stdout.write(self.style.SUCCESS(f"Checked {checked} titles, {action} drift on {len(drift)}."))
+        self.stdout.write(f"Watermark: {watermark.isoformat()}")
@@ -0,0 +1,80 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+
+from Api.catalogue import batched
+from Api.models import Review, StreamPlatform, WatchList
+from Api.ratings import recompute_ratings
+
+PERF_PASSWORD = 'perf-password-123'
+
+
+class Command(BaseCommand):
+    """
+    Generates a synthetic catalogue at production-like scale with bulk inserts.
+
+    Users are named `<prefix>-user-<n>@example.com` and share the password PERF_PASSWORD
+    (hashed once), so the load test can log in as any of them. Re-running with the same
+    prefix skips rows that already exist.
+    """
+    help = "Seed platforms, titles, users and reviews for performance testing."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--platforms', type=int, default=10)
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--reviews', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--prefix', default='perf')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options['reviews'] > options['titles'] * options['users']:
+            raise CommandError("--reviews cannot exceed --titles x --users (one review per user and title).")
+        rng = random.Random(options['seed'])
+        prefix, batch_size = options['prefix'], options['batch_size']
+        User = get_user_model()
+
+        self.insert('platforms', StreamPlatform, (
+            StreamPlatform(name=f"{prefix}-platform-{n}", about="Synthetic platform", website=f"https://{prefix}-{n}.example.com")
+            for n in range(options['platforms'])
+        ), batch_size)
+        platform_ids = list(StreamPlatform.objects.filter(name__startswith=f"{prefix}-platform-").values_list('pk', flat=True))
+
+        self.insert('titles', WatchList, (
+            WatchList(platform_id=platform_ids[n % len(platform_ids)], title=f"{prefix} title {n}", description="Synthetic title")
+            for n in range(options['titles'])
+        ), batch_size)
+        title_ids = list(WatchList.objects.filter(title__startswith=f"{prefix} title ").values_list('pk', flat=True))
+
+        password = make_password(PERF_PASSWORD)
+        self.insert('users', User, (
+            User(email=f"{prefix}-user-{n}@example.com", username=f"{prefix}-user-{n}", password=password,
+                 first_name="Perf", is_superuser=False)
+            for n in range(options['users'])
+        ), batch_size)
+        user_ids = list(User.objects.filter(email__startswith=f"{prefix}-user-").values_list('pk', flat=True))
+
+        pairs = rng.sample(range(len(title_ids) * len(user_ids)), min(options['reviews'], len(title_ids) * len(user_ids)))
+        self.insert('reviews', Review, (
+            Review(
+                watchlist_id=title_ids[pair // len(user_ids)], review_user_id=user_ids[pair % len(user_ids)],
+                rating=rng.randint(1, 5), description="Synthetic review",
+            )
+            for pair in pairs
+        ), batch_size)
+
+        checked, _ = recompute_ratings(WatchList.objects.filter(title__startswith=f"{prefix} title "))
+        self.stdout.write(f"ratings: recomputed {checked} titles")
+
+    def insert(self, label, model, objects, batch_size):
+        start = time.perf_counter()
+        total = 0
+        for batch in batched(objects, batch_size):
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+            total += len(batch)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"{label}: {total} rows in {elapsed:.2f}s"))
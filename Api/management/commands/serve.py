@@ -0,0 +1,146 @@
+import importlib.util
+import json
+import os
+import subprocess
+import sys
+
+from django.core import checks
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management.base import BaseCommand, CommandError
+
+from Api.events import check_workers
+from core import gunicorn_conf
+
+# Boots an interpreter the way gunicorn does and reports what a worker costs. `cold`: the worker
+# imports the app itself; `preloaded`: it is forked from a master that imported the app; `warm`:
+# the master also ran core.warmup and gc.freeze() before forking
+MEASURE_SCRIPT = """
+import gc, json, os, sys, time
+from wsgiref.util import setup_testing_defaults
+
+def memory_mb(field):
+    # smaps_rollup splits resident memory into pages shared with the master and pages private to this process
+    total = 0
+    with open('/proc/self/smaps_rollup') as smaps:
+        for line in smaps:
+            name, value = line.split(':', 1)
+            if name in field:
+                total += int(value.split()[0])
+    return total / 1024
+
+def serve(application, path):
+    environ = {'PATH_INFO': path, 'HTTP_HOST': 'localhost'}
+    setup_testing_defaults(environ)
+    start = time.perf_counter()
+    body = application(environ, lambda status, headers: None)
+    b''.join(body)
+    body.close()
+    return (time.perf_counter() - start) * 1000
+
+def worker(application, result):
+    result['first_request_ms'] = serve(application, sys.argv[2])
+    result['second_request_ms'] = serve(application, sys.argv[2])
+    result['rss_mb'] = memory_mb(('Rss',))
+    result['private_mb'] = memory_mb(('Private_Clean', 'Private_Dirty'))
+    print(json.dumps(result))
+
+start = time.perf_counter()
+from core.wsgi import application
+from django.conf import settings
+settings.ALLOWED_HOSTS = ['localhost']
+import importlib
+importlib.import_module(settings.ROOT_URLCONF)
+result = {'boot_ms': (time.perf_counter() - start) * 1000}
+if sys.argv[1] == 'cold':
+    worker(application, result)
+else:
+    from core.warmup import warm_up
+    start = time.perf_counter()
+    if sys.argv[1] == 'warm':
+        warm_up()
+    gc.freeze()
+    result['warm_up_ms'] = (time.perf_counter() - start) * 1000
+    sys.stdout.flush()
+    pid = os.fork()
+    if pid == 0:
+        worker(application, result)
+        sys.stdout.flush()
+        os._exit(0)
+    os.waitpid(pid, 0)
+"""
+
+MODES = ('cold', 'preloaded', 'warm')
+
+
+class Command(BaseCommand):
+    """
+    Runs the production server with core/gunicorn_conf.py: preloaded, warmed-up app and
+    workers/threads sized from the available CPUs.
+
+    `--print-config` shows the sizing without starting anything, and `--measure` compares
+    workers that boot the app themselves with workers forked from a preloaded master, with and
+    without warm-up: boot time, warm-up latency, first-request latency and private memory per
+    worker, which is how the numbers in core/gunicorn_conf.py were taken (Linux only, it reads /proc).
+
+    `--asgi` refuses more than one worker while REVIEW_EVENTS_BACKEND only reaches its own process,
+    and the server does not start while the cache deployment checks fail.
+    """
+    help = "Run the production server (gunicorn) or measure worker boot costs."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--bind', default=gunicorn_conf.bind)
+        parser.add_argument('--workers', type=int, default=gunicorn_conf.workers)
+        parser.add_argument('--threads', type=int, default=gunicorn_conf.threads)
+        parser.add_argument('--asgi', action='store_true', help="Serve core.asgi with uvicorn workers.")
+        parser.add_argument('--print-config', action='store_true')
+        parser.add_argument('--measure', action='store_true')
+        parser.add_argument('--path', default='/api/v1/home/', help="Request timed by --measure.")
+
+    def handle(self, *args, **options):
+        if options['measure']:
+            return self.measure(options['path'])
+
+        env = dict(
+            os.environ,
+            BIND=options['bind'], WEB_CONCURRENCY=str(options['workers']), WEB_THREADS=str(options['threads']),
+        )
+        app = 'core.wsgi:application'
+        if options['asgi']:
+            try:
+                check_workers(options['workers'])
+            except ImproperlyConfigured as exc:
+                raise CommandError(f"{exc} Pass --workers 1.")
+            env['WEB_WORKER_CLASS'] = 'uvicorn.workers.UvicornWorker'
+            app = 'core.asgi:application'
+        self.stdout.write(
+            f"{app} on {options['bind']}: {options['workers']} workers x {options['threads']} threads "
+            f"({gunicorn_conf.cpu_count()} CPUs available), worker class {env.get('WEB_WORKER_CLASS', gunicorn_conf.worker_class)}"
+        )
+        if options['print_config']:
+            return
+        # Settings that only break once several workers share the load (see core/idempotency.py)
+        self.check(tags=[checks.Tags.caches], include_deployment_checks=True)
+        if importlib.util.find_spec('gunicorn') is None:
+            raise CommandError("gunicorn is not installed; `pip install gunicorn` (and uvicorn for --asgi).")
+        sys.stdout.flush()
+        os.execve(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', 'python:core.gunicorn_conf', app], env)
+
+    def measure(self, path):
+        results = {}
+        for label in MODES:
+            completed = subprocess.run(
+                [sys.executable, '-c', MEASURE_SCRIPT, label, path],
+                capture_output=True, text=True, env=dict(os.environ),
+            )
+            if completed.returncode != 0:
+                raise CommandError(completed.stderr[-2000:])
+            results[label] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+        self.stdout.write(f"boot: {results['cold']['boot_ms']:.1f} ms, warm-up: {results['warm']['warm_up_ms']:.1f} ms")
+        self.stdout.write(f"{'worker':<10} {'1st req ms':>10} {'2nd req ms':>10} {'private MB':>10} {'RSS MB':>8}")
+        for label in MODES:
+            result = results[label]
+            self.stdout.write(
+                f"{label:<10} {result['first_request_ms']:>10.1f} {result['second_request_ms']:>10.1f} "
+                f"{result['private_mb']:>10.1f} {result['rss_mb']:>8.1f}"
+            )
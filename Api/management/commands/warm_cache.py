@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from Api import cache
+from Api.catalogue import batched
+from Api.models import WatchList
+from Api.views import platform_list_payload, platform_summary_payload, title_list_payload, title_payloads
+
+
+class Command(BaseCommand):
+    """
+    Precomputes the cached catalogue payloads (see Api/cache.py) so the first requests after
+    a deploy are served from the cache instead of all missing at once.
+
+    Warms the platform list (nested and summary), the title list and the `--top` titles by
+    number of ratings, in a pool of `--workers` threads; `--workers 1` runs in the calling
+    thread. Existing entries are overwritten. Does nothing while caching is off, which it is
+    unless the servers share a cache (CACHE_BACKEND) or CATALOGUE_CACHE=True.
+    """
+    help = "Warm the catalogue payload cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=200, help="Number of most-rated titles to cache.")
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--batch-size', type=int, default=50, help="Titles serialized per task.")
+
+    def handle(self, *args, **options):
+        if not cache.caching_enabled():
+            self.stderr.write(self.style.WARNING(
+                "Catalogue caching is off: the default cache is local to each process. "
+                "Set CACHE_BACKEND to a shared cache (or CATALOGUE_CACHE=True) to enable it."
+            ))
+            return
+
+        top_ids = list(
+            WatchList.active_objects.order_by('-number_rating', 'pk').values_list('pk', flat=True)[:options['top']]
+        )
+        tasks = [
+            ('platforms', lambda: cache.refresh_listing(cache.PLATFORM_LIST_KEY, platform_list_payload)),
+            ('platform summary', lambda: cache.refresh_listing(cache.PLATFORM_SUMMARY_KEY, platform_summary_payload)),
+            ('titles', lambda: cache.refresh_listing(cache.TITLE_LIST_KEY, title_list_payload)),
+        ]
+        for batch in batched(top_ids, options['batch_size']):
+            tasks.append((f"{len(batch)} top titles", lambda batch=batch: cache.refresh_titles(batch, title_payloads)))
+
+        start = time.perf_counter()
+        if options['workers'] == 1:
+            timings = [self.run(task) for task in tasks]
+        else:
+            with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+                timings = list(pool.map(self.run_pooled, tasks))
+        elapsed = time.perf_counter() - start
+
+        for label, task_ms in timings:
+            self.stdout.write(f"{label}: {task_ms:.1f} ms")
+        self.stdout.write(self.style.SUCCESS(
+            f"warmed {len(tasks)} entries ({len(top_ids)} titles) in {elapsed:.2f}s with {options['workers']} workers"
+        ))
+
+    def run(self, task):
+        label, fill = task
+        start = time.perf_counter()
+        fill()
+        return label, (time.perf_counter() - start) * 1000
+
+    def run_pooled(self, task):
+        try:
+            return self.run(task)
+        finally:
+            # Pool threads open their own database connections; close them before the thread is reused or dies
+            connections.close_all()
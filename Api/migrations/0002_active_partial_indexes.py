@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 03:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Api', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(condition=models.Q(('active', True)), fields=['watchlist', '-created'], name='review_active_watchlist_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='watchlist',
+            index=models.Index(condition=models.Q(('active', True)), fields=['-created'], name='watchlist_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.0.14 on 2026-10-19 03:50
+
+from django.conf import settings
+from django.db import migrations, models, transaction
+from django.db.models import Avg, Count
+
+BATCH_SIZE = 1000
+
+
+def recompute_title_ratings(WatchList, Review, watchlist_ids):
+    """
+    Recomputes avg_rating and number_rating of the given titles from their active reviews.
+    """
+    watchlist_ids = list(watchlist_ids)
+    for start in range(0, len(watchlist_ids), BATCH_SIZE):
+        batch = watchlist_ids[start:start + BATCH_SIZE]
+        aggregates = {
+            row['watchlist']: (row['avg_rating'], row['number_rating'])
+            for row in Review.objects.filter(watchlist__in=batch, active=True)
+            .values('watchlist').annotate(avg_rating=Avg('rating'), number_rating=Count('pk')).order_by()
+        }
+        titles = list(WatchList.objects.filter(pk__in=batch))
+        for title in titles:
+            title.avg_rating, title.number_rating = aggregates.get(title.pk, (0.0, 0))
+        WatchList.objects.bulk_update(titles, ['avg_rating', 'number_rating'])
+
+
+def delete_duplicate_reviews(apps, schema_editor):
+    """
+    Keeps one review per (watchlist, review_user), preferring active rows and then the oldest,
+    deletes the rest in batches and recomputes the ratings of the titles that lost reviews.
+    """
+    WatchList = apps.get_model('Api', 'WatchList')
+    Review = apps.get_model('Api', 'Review')
+    duplicates = (
+        Review.objects.values('watchlist', 'review_user')
+        .annotate(total=Count('pk'))
+        .filter(total__gt=1)
+        .order_by()
+    )
+    doomed = []
+    watchlist_ids = set()
+    for group in duplicates.iterator():
+        reviews = list(
+            Review.objects.filter(watchlist=group['watchlist'], review_user=group['review_user'])
+            .order_by('-active', 'pk')
+            .values_list('pk', flat=True)
+        )
+        doomed.extend(reviews[1:])
+        watchlist_ids.add(group['watchlist'])
+    for start in range(0, len(doomed), BATCH_SIZE):
+        with transaction.atomic(using=schema_editor.connection.alias):
+            Review.objects.filter(pk__in=doomed[start:start + BATCH_SIZE]).delete()
+    with transaction.atomic(using=schema_editor.connection.alias):
+        recompute_title_ratings(WatchList, Review, watchlist_ids)
+
+
+class Migration(migrations.Migration):
+
+    atomic = False
+
+    dependencies = [
+        ('Api', '0002_active_partial_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_duplicate_reviews, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(fields=('watchlist', 'review_user'), name='unique_review_per_user'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 03:53
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Api', '0003_unique_review_per_user'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='streamplatform',
+            name='name',
+            field=models.CharField(db_index=True, max_length=30),
+        ),
+        migrations.AlterField(
+            model_name='watchlist',
+            name='title',
+            field=models.CharField(db_index=True, max_length=50),
+        ),
+    ]
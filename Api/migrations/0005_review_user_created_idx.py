@@ -0,0 +1,19 @@
+# Generated by Django 5.0.14 on 2026-10-19 03:54
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Api', '0004_index_admin_search_fields'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['review_user', '-created'], name='review_user_created_idx'),
+        ),
+    ]
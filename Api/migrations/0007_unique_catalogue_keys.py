@@ -0,0 +1,80 @@
+# Generated by Django 5.0.14 on 2026-10-19 03:59
+
+from django.db import migrations, models
+from django.db.models import Avg, Count, Min
+
+
+def recompute_title_ratings(WatchList, Review, watchlist_ids):
+    """
+    Recomputes avg_rating and number_rating of the given titles from their active reviews.
+    """
+    aggregates = {
+        row['watchlist']: (row['avg_rating'], row['number_rating'])
+        for row in Review.objects.filter(watchlist__in=watchlist_ids, active=True)
+        .values('watchlist').annotate(avg_rating=Avg('rating'), number_rating=Count('pk')).order_by()
+    }
+    titles = list(WatchList.objects.filter(pk__in=watchlist_ids))
+    for title in titles:
+        title.avg_rating, title.number_rating = aggregates.get(title.pk, (0.0, 0))
+    WatchList.objects.bulk_update(titles, ['avg_rating', 'number_rating'])
+
+
+def merge_duplicate_catalogue_rows(apps, schema_editor):
+    """
+    Merges platforms sharing a name and titles sharing (platform, title) into the oldest row.
+    Reviews of a merged title move to the kept title unless its author already reviewed it,
+    and the ratings of the kept titles are recomputed.
+    """
+    StreamPlatform = apps.get_model('Api', 'StreamPlatform')
+    WatchList = apps.get_model('Api', 'WatchList')
+    Review = apps.get_model('Api', 'Review')
+
+    platforms = (
+        StreamPlatform.objects.values('name').annotate(keep=Min('pk'), total=Count('pk')).filter(total__gt=1).order_by()
+    )
+    for group in platforms.iterator():
+        duplicates = StreamPlatform.objects.filter(name=group['name']).exclude(pk=group['keep'])
+        WatchList.objects.filter(platform__in=duplicates).update(platform=group['keep'])
+        duplicates.delete()
+
+    titles = (
+        WatchList.objects.values('platform', 'title').annotate(keep=Min('pk'), total=Count('pk')).filter(total__gt=1).order_by()
+    )
+    merged = []
+    for group in titles.iterator():
+        merged.append(group['keep'])
+        duplicates = WatchList.objects.filter(platform=group['platform'], title=group['title']).exclude(pk=group['keep'])
+        for duplicate in duplicates:
+            kept_reviewers = Review.objects.filter(watchlist=group['keep']).values('review_user')
+            Review.objects.filter(watchlist=duplicate, review_user__in=kept_reviewers).delete()
+            Review.objects.filter(watchlist=duplicate).update(watchlist=group['keep'])
+            duplicate.delete()
+    recompute_title_ratings(WatchList, Review, merged)
+
+
+class Migration(migrations.Migration):
+
+    # PostgreSQL refuses to alter tables with pending trigger events, so the data migration
+    # commits on its own before the constraints are added
+    atomic = False
+
+    dependencies = [
+        ('Api', '0006_changelogentry'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_catalogue_rows, migrations.RunPython.noop, atomic=True),
+        migrations.AlterField(
+            model_name='streamplatform',
+            name='name',
+            field=models.CharField(max_length=30),
+        ),
+        migrations.AddConstraint(
+            model_name='streamplatform',
+            constraint=models.UniqueConstraint(fields=('name',), name='unique_platform_name'),
+        ),
+        migrations.AddConstraint(
+            model_name='watchlist',
+            constraint=models.UniqueConstraint(fields=('platform', 'title'), name='unique_title_per_platform'),
+        ),
+    ]
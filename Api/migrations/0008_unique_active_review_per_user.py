@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:30
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Api', '0007_unique_catalogue_keys'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='review',
+            name='unique_review_per_user',
+        ),
+        migrations.AddConstraint(
+            model_name='review',
+            constraint=models.UniqueConstraint(condition=models.Q(('active', True)), fields=('watchlist', 'review_user'), name='unique_active_review_per_user'),
+        ),
+    ]
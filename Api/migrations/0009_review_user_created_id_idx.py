@@ -0,0 +1,23 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('Api', '0008_unique_active_review_per_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='review',
+            name='review_user_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['review_user', '-created', '-id'], name='review_user_created_id_idx'),
+        ),
+    ]
@@ -1,11 +1,56 @@
 from django.db import models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.conf import settings  # Import settings to get the custom user model
+from django.db.models.functions import Coalesce, NullIf
 
 # Create your models here.
 
+class ActiveManager(models.Manager):
+    """
+    Manager that only returns rows flagged as active; used for API reads.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().filter(active=True)
+
+
+class ReviewQuerySet(models.QuerySet):
+
+    def with_author(self):
+        """
+        Joins the reviewer and loads only the columns ReviewSerializer renders,
+        so listing reviews never queries users one row at a time.
+        """
+        return self.select_related('review_user').only(
+            'id', 'rating', 'description', 'active', 'created', 'update', 'watchlist',
+            'review_user__first_name', 'review_user__email',
+        )
+
+
+class StreamPlatformQuerySet(models.QuerySet):
+
+    def with_summary(self):
+        """
+        Annotates each platform with `title_count`, `review_count` and `avg_rating` of its active titles.
+
+        The figures come from the ratings stored on WatchList, so this is a single grouped join
+        on titles without touching the review table.
+        """
+        active = models.Q(watchlist__active=True)
+        review_count = models.Sum('watchlist__number_rating', filter=active)
+        weighted_sum = models.Sum(models.F('watchlist__avg_rating') * models.F('watchlist__number_rating'), filter=active)
+        return self.annotate(
+            title_count=models.Count('watchlist', filter=active),
+            review_count=Coalesce(review_count, 0),
+            avg_rating=Coalesce(
+                models.ExpressionWrapper(weighted_sum / NullIf(review_count, 0), output_field=models.FloatField()),
+                0.0,
+            ),
+        )
+
+
 class WatchList(models.Model):
-    title = models.CharField(max_length=50)
+    title = models.CharField(max_length=50, db_index=True)
     description = models.CharField(max_length=200)
     platform = models.ForeignKey('StreamPlatform', on_delete=models.CASCADE, related_name="watchlist")
     active = models.BooleanField(default=True)
@@ -13,6 +58,17 @@ class WatchList(models.Model):
     number_rating = models.IntegerField(default=0)
     created = models.DateTimeField(auto_now_add=True)
 
+    objects = models.Manager()
+    active_objects = ActiveManager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-created'], condition=models.Q(active=True), name='watchlist_active_created_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(fields=['platform', 'title'], name='unique_title_per_platform'),
+        ]
+
     def __str__(self):
         return self.title
     
@@ -22,6 +78,13 @@ class StreamPlatform(models.Model):
     about = models.CharField(max_length=150)
     website = models.URLField(max_length=100)
 
+    objects = StreamPlatformQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['name'], name='unique_platform_name'),
+        ]
+
     def __str__(self):
         return self.name
     
@@ -33,7 +96,50 @@ class Review(models.Model):
     active = models.BooleanField(default=True)
     created = models.DateTimeField(auto_now_add=True)
     update = models.DateTimeField(auto_now_add=True)
-       
-    
+
+    objects = ReviewQuerySet.as_manager()
+    active_objects = ActiveManager.from_queryset(ReviewQuerySet)()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['watchlist', '-created'], condition=models.Q(active=True), name='review_active_watchlist_idx'),
+            models.Index(fields=['review_user', '-created', '-id'], name='review_user_created_id_idx'),
+        ]
+        constraints = [
+            # Soft-deleted reviews do not count, so their authors can review the title again
+            models.UniqueConstraint(
+                fields=['watchlist', 'review_user'], condition=models.Q(active=True), name='unique_active_review_per_user',
+            ),
+        ]
+
+    def soft_delete(self):
+        """
+        Hides the review from API reads without removing the row.
+        """
+        self.active = False
+        self.save(update_fields=['active'])
+
     def __str__(self):
         return str(self.rating) + " | " + self.watchlist.title + " | " + str(self.review_user)
+
+
+class ChangeLogEntry(models.Model):
+    """
+    Append-only record of catalogue writes; its primary key is the cursor of the change feed.
+    """
+    SAVE = 'save'
+    DELETE = 'delete'
+    ACTION_CHOICES = [(SAVE, 'Save'), (DELETE, 'Delete')]
+
+    entity = models.CharField(max_length=30)
+    object_id = models.BigIntegerField()
+    action = models.CharField(max_length=10, choices=ACTION_CHOICES)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['entity', 'object_id'], name='changelog_entity_object_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.pk} | {self.action} {self.entity} {self.object_id}"
@@ -0,0 +1,13 @@
+from rest_framework.pagination import CursorPagination
+
+
+class ReviewTimelinePagination(CursorPagination):
+    """
+    Keyset pagination over a reviewer's timeline, newest first.
+    Pages are fetched by seeking on `created`, so deep pages cost the same as the first one;
+    `pk` breaks ties so reviews sharing a timestamp are neither repeated nor skipped.
+    """
+    ordering = ('-created', '-pk')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
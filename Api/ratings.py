@@ -0,0 +1,77 @@
+from django.db import transaction
+from django.db.models import Avg, Count, FloatField, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from .models import Review, WatchList
+from .signals import record_changes
+
+
+def annotate_rating_aggregates(queryset):
+    """
+    Annotates a WatchList queryset with the aggregates computed from its active reviews.
+
+    Parameters:
+    queryset (QuerySet): A WatchList queryset.
+
+    Returns:
+    QuerySet: The queryset annotated with `fresh_avg_rating` and `fresh_number_rating`.
+    """
+    reviews = (
+        Review.objects.filter(watchlist=OuterRef('pk'), active=True)
+        .order_by()
+        .values('watchlist')
+    )
+    return queryset.annotate(
+        fresh_avg_rating=Coalesce(
+            Subquery(reviews.annotate(value=Avg('rating')).values('value'), output_field=FloatField()),
+            Value(0.0),
+        ),
+        fresh_number_rating=Coalesce(
+            Subquery(reviews.annotate(value=Count('pk')).values('value'), output_field=IntegerField()),
+            Value(0),
+        ),
+    )
+
+
+def recompute_ratings(queryset=None, batch_size=500, dry_run=False):
+    """
+    Recomputes `avg_rating` and `number_rating` for the given titles in primary-key chunks.
+
+    Each chunk is read with one aggregated query and written back with one `bulk_update`
+    inside its own transaction, so no lock is held across the whole run.
+
+    Parameters:
+    queryset (QuerySet): The WatchList objects to recompute. Defaults to all of them.
+    batch_size (int): The number of titles handled per chunk.
+    dry_run (bool): When True, drift is reported but nothing is written.
+
+    Returns:
+    tuple: The number of titles checked and a list of (pk, old, new) tuples for every drifted title,
+    where old and new are (avg_rating, number_rating) pairs.
+    """
+    if queryset is None:
+        queryset = WatchList.objects.all()
+    queryset = annotate_rating_aggregates(queryset.order_by('pk')).only('pk', 'avg_rating', 'number_rating')
+
+    checked = 0
+    drift = []
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            chunk = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+            if not chunk:
+                break
+            stale = []
+            for watchlist in chunk:
+                old = (watchlist.avg_rating, watchlist.number_rating)
+                new = (watchlist.fresh_avg_rating, watchlist.fresh_number_rating)
+                if old[1] != new[1] or abs(old[0] - new[0]) > 1e-9:
+                    drift.append((watchlist.pk, old, new))
+                    watchlist.avg_rating, watchlist.number_rating = new
+                    stale.append(watchlist)
+            if stale and not dry_run:
+                WatchList.objects.bulk_update(stale, ['avg_rating', 'number_rating'])
+                record_changes(WatchList, [watchlist.pk for watchlist in stale])
+        checked += len(chunk)
+        last_pk = chunk[-1].pk
+    return checked, drift
@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from . models import * 
+from .models import ChangeLogEntry, Review, StreamPlatform, WatchList
 
    
 class ReviewSerializer(serializers.ModelSerializer):
@@ -7,6 +7,18 @@ class ReviewSerializer(serializers.ModelSerializer):
     class Meta:
         model = Review
         exclude = ('watchlist',)
+        # Form posts omit unchecked booleans, which would otherwise create hidden reviews
+        extra_kwargs = {'active': {'default': True}}
+
+class UserReviewSerializer(serializers.ModelSerializer):
+    title = serializers.CharField(source='watchlist.title', read_only=True)
+    platform = serializers.CharField(source='watchlist.platform.name', read_only=True)
+
+    class Meta:
+        model = Review
+        fields = ('id', 'watchlist', 'title', 'platform', 'rating', 'description', 'created', 'update')
+        read_only_fields = fields
+
 
 class WatchListSerializer(serializers.ModelSerializer):
     reviews = ReviewSerializer(many=True, read_only=True)
@@ -24,3 +36,21 @@ class StreamPlatformSerializer(serializers.ModelSerializer):
         model = StreamPlatform
         fields = "__all__"
 
+
+
+class StreamPlatformSummarySerializer(serializers.ModelSerializer):
+    title_count = serializers.IntegerField(read_only=True)
+    review_count = serializers.IntegerField(read_only=True)
+    avg_rating = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = StreamPlatform
+        fields = ('id', 'name', 'website', 'title_count', 'review_count', 'avg_rating')
+
+
+class ChangeLogEntrySerializer(serializers.ModelSerializer):
+    cursor = serializers.IntegerField(source='pk', read_only=True)
+
+    class Meta:
+        model = ChangeLogEntry
+        fields = ('cursor', 'entity', 'object_id', 'action', 'created')
@@ -0,0 +1,83 @@
+import json
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.utils.encoders import JSONEncoder
+
+from .cache import affected_titles, bump_review_versions, invalidate_titles
+from .events import get_broker, watchlist_channel
+from .models import ChangeLogEntry, Review, StreamPlatform, WatchList
+from .serializers import ReviewSerializer
+
+
+def record_changes(model, object_ids, action=ChangeLogEntry.SAVE):
+    """
+    Appends change-feed entries for writes that bypass model signals (bulk_update, update()).
+
+    Parameters:
+    model (Model): The model class that was written.
+    object_ids (iterable): The primary keys of the written rows.
+    action (str): ChangeLogEntry.SAVE or ChangeLogEntry.DELETE.
+
+    Returns:
+    None
+    """
+    object_ids = list(object_ids)
+    entity = model._meta.model_name
+    ChangeLogEntry.objects.bulk_create(
+        [ChangeLogEntry(entity=entity, object_id=object_id, action=action) for object_id in object_ids]
+    )
+    title_ids = affected_titles(model, object_ids)
+    invalidate_titles(title_ids)
+    if model is Review:
+        bump_review_versions(title_ids)
+
+
+@receiver(post_save, sender=StreamPlatform)
+@receiver(post_save, sender=WatchList)
+@receiver(post_save, sender=Review)
+def log_save(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    # Inactive rows are hidden from API reads, so consumers should drop them
+    action = ChangeLogEntry.SAVE if getattr(instance, 'active', True) else ChangeLogEntry.DELETE
+    ChangeLogEntry.objects.create(entity=sender._meta.model_name, object_id=instance.pk, action=action)
+
+
+@receiver(post_delete, sender=StreamPlatform)
+@receiver(post_delete, sender=WatchList)
+@receiver(post_delete, sender=Review)
+def log_delete(sender, instance, **kwargs):
+    ChangeLogEntry.objects.create(entity=sender._meta.model_name, object_id=instance.pk, action=ChangeLogEntry.DELETE)
+
+
+@receiver(post_save, sender=StreamPlatform)
+@receiver(post_delete, sender=StreamPlatform)
+@receiver(post_save, sender=WatchList)
+@receiver(post_delete, sender=WatchList)
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+def drop_cached_payloads(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    if sender is Review:
+        invalidate_titles([instance.watchlist_id])
+        bump_review_versions([instance.watchlist_id])
+    elif sender is WatchList:
+        invalidate_titles([instance.pk])
+    else:
+        invalidate_titles(affected_titles(StreamPlatform, [instance.pk]))
+
+
+@receiver(post_save, sender=Review)
+def publish_review(sender, instance, created, raw=False, **kwargs):
+    if raw or not instance.active:
+        return
+    message = json.dumps(
+        {'event': 'created' if created else 'updated', 'review': ReviewSerializer(instance).data},
+        cls=JSONEncoder,
+    )
+    channel = watchlist_channel(instance.watchlist_id)
+    # Subscribers should only hear about reviews they can already read
+    transaction.on_commit(lambda: get_broker().publish(channel, message))
@@ -0,0 +1,8 @@
+from rest_framework.throttling import UserRateThrottle
+
+
+class ReviewEventsThrottle(UserRateThrottle):
+    """
+    Limits how often a user can open a review event stream; each open stream holds a subscription.
+    """
+    scope = 'review_events'
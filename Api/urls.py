@@ -9,11 +9,16 @@ urlpatterns = [
     path('', include(router.urls)),  # Your main url path
     path('home/', views.homepage),  # Your endpoint here
     path('watchlist/', views.WatchListAPIView.as_view()),  # Your endpoint here
+    path('watchlist/batch/', views.WatchListBatchView.as_view()),
     path('watchlist/<int:pk>/', views.WatchListDetailView.as_view()),  # Your endpoint here
     # path('stream_platforms/', views.StreamPlatform.as_view()),  # Your endpoint here
     # path('stream_platforms/<int:pk>', views.StreamPlatformDetailView.as_view()),  # Your endpoint here
     path('stream/<int:pk>/review/', views.ReviewList.as_view()),  # Your endpoint here
+    path('stream/<int:pk>/review/events/', views.review_events),
     path('<int:pk>/review-create/', views.ReviewCreate.as_view()),  # Your endpoint here
     path('stream/review/<int:pk>/', views.ReviewDetails.as_view()),  # Your endpoint here
+    path('me/reviews/', views.UserReviewList.as_view()),
+    path('changes/', views.ChangeFeedView.as_view()),
+    path('reviews/export/', views.ReviewExportView.as_view()),
 
 ]
\ No newline at end of file
@@ -1,21 +1,92 @@
 
-from django.http import Http404
-from django.shortcuts import render
-from rest_framework.permissions import IsAuthenticated
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.db import IntegrityError, transaction
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db.models import Prefetch
+from django.http import Http404, JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.shortcuts import get_object_or_404, render
+from rest_framework.permissions import IsAdminUser, IsAuthenticated
 from rest_framework.decorators import api_view
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import APIException, NotAuthenticated, Throttled, ValidationError
+from rest_framework.request import Request
+from rest_framework.settings import api_settings
 from rest_framework import status
 from rest_framework import viewsets
 from Api.permissions import IsAdminOrReadOnly,IsReviewUserOrReadOnly
+from core.idempotency import idempotent
 from rest_framework import generics
-from .models import * 
-from .serializers import * 
+from .models import ChangeLogEntry, Review, StreamPlatform, WatchList
+from .serializers import (
+    ChangeLogEntrySerializer,
+    ReviewSerializer,
+    StreamPlatformSerializer,
+    StreamPlatformSummarySerializer,
+    UserReviewSerializer,
+    WatchListSerializer,
+)
+from .pagination import ReviewTimelinePagination
+from .throttling import ReviewEventsThrottle
+from .cache import (
+    PLATFORM_LIST_KEY,
+    PLATFORM_SUMMARY_KEY,
+    TITLE_LIST_KEY,
+    cached_listing,
+    cached_review_page,
+    cached_title,
+    cached_titles,
+)
+from .events import get_broker, watchlist_channel
+from .exports import EXPORT_FORMATS, export_stream, parse_bound
+from .ratings import recompute_ratings
 
 # Create your views here.
 
 
+def active_reviews():
+    """
+    Builds the prefetch used for nested reviews: active rows only, with their authors joined.
+
+    Returns:
+    Prefetch: A prefetch for the `reviews` relation of WatchList.
+    """
+    return Prefetch('reviews', queryset=Review.active_objects.with_author())
+
+
+# Payload builders for the cached catalogue reads (see Api/cache.py and `manage.py warm_cache`)
+
+def title_payloads(ids):
+    """
+    Serializes the given active titles with their platform and active reviews.
+
+    Parameters:
+    ids (list): WatchList primary keys.
+
+    Returns:
+    dict: {pk: payload} for the ids that exist and are active.
+    """
+    found = WatchList.active_objects.select_related('platform').prefetch_related(active_reviews()).in_bulk(ids)
+    return {pk: WatchListSerializer(watchlist).data for pk, watchlist in found.items()}
+
+
+def title_list_payload():
+    watchlists = WatchList.active_objects.select_related('platform').prefetch_related(active_reviews())
+    return WatchListSerializer(watchlists, many=True).data
+
+
+def platform_list_payload():
+    return StreamPlatformSerializer(StreamPlatformVS.queryset.all(), many=True).data
+
+
+def platform_summary_payload():
+    return StreamPlatformSummarySerializer(StreamPlatform.objects.with_summary().order_by('name'), many=True).data
+
+
 @api_view(["GET"])
 def homepage(request):
     """
@@ -44,12 +115,11 @@ class WatchListAPIView(APIView):
         request (Request): The incoming request object.
 
         Returns:
-        Response: A JSON response containing serialized WatchList objects.
+        Response: A JSON response containing serialized WatchList objects, served from the catalogue cache.
         """
-        watchlists = WatchList.objects.all()
-        serializer = WatchListSerializer(watchlists, many=True)
-        return Response(serializer.data)
+        return Response(cached_listing(TITLE_LIST_KEY, title_list_payload))
 
+    @idempotent
     def post(self, request):
         """
         This method handles POST requests to create a new WatchList object.
@@ -76,16 +146,16 @@ class WatchListDetailView(APIView):
 
     def get_object(self, pk):
         """
-        This method retrieves a WatchList object by its primary key.
+        This method retrieves an active WatchList object by its primary key.
 
         Parameters:
         pk (int): The primary key of the WatchList object.
 
         Returns:
-        WatchList: The WatchList object if found, or raises a 404 exception if not found.
+        WatchList: The WatchList object if found, or raises a 404 exception if not found or inactive.
         """
         try:
-            return WatchList.objects.get(pk=pk)
+            return WatchList.active_objects.select_related('platform').prefetch_related(active_reviews()).get(pk=pk)
         except WatchList.DoesNotExist:
             raise Http404
 
@@ -98,11 +168,12 @@ class WatchListDetailView(APIView):
         pk (int): The primary key of the WatchList object.
 
         Returns:
-        Response: A JSON response containing the serialized WatchList object.
+        Response: A JSON response containing the serialized WatchList object, served from the per-title cache.
         """
-        watchlist = self.get_object(pk)
-        serializer = WatchListSerializer(watchlist)
-        return Response(serializer.data)
+        payload = cached_title(pk, lambda: title_payloads([pk]).get(pk))
+        if payload is None:
+            raise Http404
+        return Response(payload)
 
     def put(self, request, pk, format=None):
         """
@@ -125,6 +196,40 @@ class WatchListDetailView(APIView):
 
 
 
+class WatchListBatchView(APIView):
+    """
+    This class-based view returns many WatchList objects in one request, e.g. for recommendation grids.
+    """
+    max_ids = 100
+
+    def get(self, request):
+        """
+        This method handles GET requests for the WatchList objects listed in `ids`.
+
+        Parameters:
+        request (Request): The incoming request object with an `ids` query param such as `1,2,3`.
+
+        Returns:
+        Response: A JSON response with the found objects in the requested order and the ids that do not exist.
+        Titles are read from the per-title cache shared with the detail view; misses are loaded in one query.
+        """
+        try:
+            ids = list(dict.fromkeys(int(value) for value in request.query_params.get('ids', '').split(',') if value))
+        except ValueError:
+            raise ValidationError("`ids` must be a comma-separated list of integers.")
+        if not ids:
+            raise ValidationError("`ids` is required.")
+        if len(ids) > self.max_ids:
+            raise ValidationError(f"At most {self.max_ids} ids can be requested at once.")
+
+        found = cached_titles(ids, title_payloads)
+        return Response({
+            'results': [found[pk] for pk in ids if pk in found],
+            'missing': [pk for pk in ids if pk not in found],
+        })
+
+
+
 class StreamPlatformAPIView(APIView):
     """
     This class-based view handles CRUD operations for StreamPlatform objects.
@@ -226,6 +331,8 @@ class ReviewList(generics.ListAPIView):
     """
     serializer_class = ReviewSerializer
     # permission_classes = [IsAdminOrReadOnly]
+    # Query parameters that select a page, and so the only ones in the cache key; none while the list is unpaginated
+    page_query_params = ()
 
     def get_queryset(self):
         """
@@ -235,10 +342,31 @@ class ReviewList(generics.ListAPIView):
         None
 
         Returns:
-        QuerySet: A QuerySet containing the Review objects for the specified WatchList object.
+        QuerySet: A QuerySet containing the active Review objects for the specified WatchList object.
         """
+        if getattr(self, 'swagger_fake_view', False):
+            return Review.objects.none()
         pk = self.kwargs['pk']
-        return Review.objects.filter(watchlist=pk)
+        return Review.active_objects.with_author().filter(watchlist=pk).order_by('-created')
+
+    def list(self, request, *args, **kwargs):
+        """
+        This method serves the reviews from the cache until a review of the WatchList object is written.
+
+        Pages are cached per value of `page_query_params` under the WatchList object's review
+        version, only when catalogue caching is on (see Api/cache.py). Other query parameters
+        do not create extra copies.
+
+        Parameters:
+        request (Request): The request object.
+
+        Returns:
+        Response: A Response object containing the serialized Review objects.
+        """
+        build = super().list
+        page_params = {name: request.query_params[name] for name in self.page_query_params if name in request.query_params}
+        data = cached_review_page(self.kwargs['pk'], page_params, lambda: build(request, *args, **kwargs).data)
+        return Response(data)
 
     # def get(self, request, *args, **kwargs):
     #     queryset = self.get_queryset()
@@ -247,6 +375,78 @@ class ReviewList(generics.ListAPIView):
 
 
 
+def authorize_review_events(request):
+    """
+    Runs DRF authentication and the review-events throttle for the plain Django view below.
+
+    Parameters:
+    request (HttpRequest): The incoming request object.
+
+    Returns:
+    JsonResponse: The error response to send, or None when the stream may be opened.
+    """
+    drf_request = Request(request, authenticators=[auth() for auth in api_settings.DEFAULT_AUTHENTICATION_CLASSES])
+    try:
+        if not drf_request.user.is_authenticated:
+            raise NotAuthenticated()
+        throttle = ReviewEventsThrottle()
+        if not throttle.allow_request(drf_request, None):
+            raise Throttled(throttle.wait())
+    except APIException as exc:
+        response = JsonResponse({'detail': exc.detail}, status=exc.status_code)
+        if isinstance(exc, Throttled) and exc.wait is not None:
+            response['Retry-After'] = str(int(exc.wait))
+        return response
+    return None
+
+
+async def review_events(request, pk):
+    """
+    This async view streams new and updated reviews of a WatchList object as server-sent events
+    to authenticated users.
+
+    Only the ASGI application serves it: under WSGI a streaming response is consumed by a worker
+    thread until the client disconnects, and this stream never ends.
+
+    Parameters:
+    request (HttpRequest): The incoming request object.
+    pk (int): The primary key of the WatchList object.
+
+    Returns:
+    StreamingHttpResponse: A `text/event-stream` response that emits a heartbeat comment while idle.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'detail': "Review events are only served by the ASGI application (manage.py serve --asgi)."}, status=501,
+        )
+    error = await sync_to_async(authorize_review_events)(request)
+    if error is not None:
+        return error
+    if not await WatchList.active_objects.filter(pk=pk).aexists():
+        raise Http404
+
+    broker = get_broker()
+    subscription = broker.subscribe(watchlist_channel(pk), settings.REVIEW_STREAM_BUFFER)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while True:
+                message = await subscription.get(settings.REVIEW_STREAM_HEARTBEAT)
+                if message is None:
+                    yield ": heartbeat\n\n"
+                else:
+                    yield f"event: review\ndata: {message}\n\n"
+        finally:
+            broker.unsubscribe(subscription)
+
+    response = StreamingHttpResponse(event_stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+
 class ReviewCreate(generics.CreateAPIView):
     """
     This class-based view handles creating a new Review object for a specific WatchList object.
@@ -266,6 +466,13 @@ class ReviewCreate(generics.CreateAPIView):
         """
         return Review.objects.all()
 
+    @idempotent
+    def post(self, request, *args, **kwargs):
+        """
+        This method handles POST requests; retries carrying the same Idempotency-Key replay the first response.
+        """
+        return super().post(request, *args, **kwargs)
+
     def perform_create(self, serializer):
         """
         This method handles the creation of a new Review object.
@@ -276,41 +483,220 @@ class ReviewCreate(generics.CreateAPIView):
         Returns:
         None
         """
-        watchlist = WatchList.objects.get(pk=self.kwargs['pk'])
+        watchlist = get_object_or_404(WatchList.active_objects, pk=self.kwargs['pk'])
         review_user = self.request.user
-        # Use `filter()` instead of `all()` to filter the queryset
-        review_queryset = Review.objects.filter(watchlist=watchlist, review_user=review_user)
 
-        if review_queryset.exists():
+        # The unique constraint on active (watchlist, review_user) pairs rejects duplicates in the same round-trip as the insert
+        try:
+            with transaction.atomic():
+                # New reviews are always active, so they always count towards the aggregates below
+                serializer.save(watchlist=watchlist, review_user=review_user, active=True)
+
+                # Update the watchlist's average rating
+                if watchlist.number_rating == 0:
+                    watchlist.avg_rating = serializer.validated_data['rating']
+                else:
+                    watchlist.avg_rating = (watchlist.avg_rating * watchlist.number_rating + serializer.validated_data['rating']) / (watchlist.number_rating + 1)
+
+                watchlist.number_rating += 1
+                watchlist.save()
+        except IntegrityError:
+            # Only a clash with the user's active review is theirs to fix; anything else is a server error
+            if not Review.active_objects.filter(watchlist=watchlist, review_user=review_user).exists():
+                raise
             raise ValidationError("You already have a review for this watchlist item.")
-        
-        # Update the watchlist's average rating
-        if watchlist.number_rating == 0:
-           watchlist.avg_rating = serializer.validated_data['rating']
-        else:
-            watchlist.avg_rating = (watchlist.avg_rating * watchlist.number_rating + serializer.validated_data['rating']) / (watchlist.number_rating + 1)
-        
-        watchlist.number_rating += 1
-        watchlist.save()
-
-        # Save the review with the associated watchlist and user
-        serializer.save(watchlist=watchlist, review_user=review_user)
 
 
 
 class ReviewDetails(generics.RetrieveUpdateDestroyAPIView):
     """
     This class-based view handles CRUD operations for a specific Review object.
+    Deleting a review soft-deletes it, and every write refreshes the watchlist's rating aggregates.
     """
-    queryset = Review.objects.all()
+    queryset = Review.active_objects.with_author()
     serializer_class = ReviewSerializer
     permission_classes = [IsAdminOrReadOnly]
 
+    def perform_update(self, serializer):
+        """
+        This method saves the updated Review object and refreshes its watchlist's aggregates.
+
+        Parameters:
+        serializer (ReviewSerializer): The serializer containing the validated data.
+
+        Returns:
+        None
+        """
+        review = serializer.save()
+        recompute_ratings(WatchList.objects.filter(pk=review.watchlist_id))
+
+    def perform_destroy(self, instance):
+        """
+        This method soft-deletes the Review object and refreshes its watchlist's aggregates.
+
+        Parameters:
+        instance (Review): The Review object being deleted.
+
+        Returns:
+        None
+        """
+        instance.soft_delete()
+        recompute_ratings(WatchList.objects.filter(pk=instance.watchlist_id))
+
+
+
+class UserReviewList(generics.ListAPIView):
+    """
+    This class-based view lists the authenticated user's reviews, newest first, with keyset pagination.
+    """
+    serializer_class = UserReviewSerializer
+    permission_classes = [IsAuthenticated]
+    pagination_class = ReviewTimelinePagination
+
+    def get_queryset(self):
+        """
+        This method retrieves the active Review objects written by the requesting user.
+
+        Parameters:
+        None
+
+        Returns:
+        QuerySet: A QuerySet of the user's reviews with their watchlist and platform joined.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Review.objects.none()
+        return Review.active_objects.filter(review_user=self.request.user).select_related('watchlist__platform')
+
 
 
 class StreamPlatformVS(viewsets.ModelViewSet):
     """
     This class-based view handles CRUD operations for StreamPlatform objects using Django REST framework's ModelViewSet.
+    Listing with `?view=summary` returns flat platforms with title/review counts instead of nested titles.
     """
-    queryset = StreamPlatform.objects.all()
-    serializer_class = StreamPlatformSerializer
\ No newline at end of file
+    queryset = StreamPlatform.objects.prefetch_related(
+        Prefetch(
+            'watchlist',
+            queryset=WatchList.active_objects.prefetch_related(active_reviews()),
+        )
+    )
+    serializer_class = StreamPlatformSerializer
+
+    def is_summary(self):
+        # Schema generation instantiates the view without a request
+        return self.action == 'list' and self.request is not None and self.request.query_params.get('view') == 'summary'
+
+    def get_queryset(self):
+        """
+        This method returns the annotated summary queryset for `?view=summary` lists, and the nested one otherwise.
+
+        Parameters:
+        None
+
+        Returns:
+        QuerySet: A QuerySet of StreamPlatform objects.
+        """
+        if self.is_summary():
+            return StreamPlatform.objects.with_summary().order_by('name')
+        return super().get_queryset()
+
+    def get_serializer_class(self):
+        if self.is_summary():
+            return StreamPlatformSummarySerializer
+        return super().get_serializer_class()
+
+    def list(self, request, *args, **kwargs):
+        """
+        This method returns the platform list, nested or summary, from the catalogue cache.
+
+        Parameters:
+        request (Request): The incoming request object.
+
+        Returns:
+        Response: A JSON response containing the serialized StreamPlatform objects.
+        """
+        if self.is_summary():
+            return Response(cached_listing(PLATFORM_SUMMARY_KEY, platform_summary_payload))
+        return Response(cached_listing(PLATFORM_LIST_KEY, platform_list_payload))
+
+
+class ChangeFeedView(APIView):
+    """
+    This class-based view returns catalogue changes after a cursor so consumers can sync incrementally.
+
+    The cursor is the entry's primary key, which is assigned at insert time, not at commit time:
+    a transaction can commit entry N after a consumer has already read N + 1. Entries are
+    therefore only served once they are CHANGE_FEED_SAFETY_LAG seconds old, so no entry is
+    skipped as long as the transaction that wrote it committed within that lag.
+    """
+    default_limit = 500
+    max_limit = 1000
+
+    def get(self, request):
+        """
+        This method handles GET requests for the changes recorded after `since`.
+
+        Parameters:
+        request (Request): The incoming request object with optional `since` and `limit` query params.
+
+        Returns:
+        Response: A JSON response with the changes, the cursor to resume from and whether more are pending.
+        """
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = min(int(request.query_params.get('limit', self.default_limit)), self.max_limit)
+        except ValueError:
+            raise ValidationError("`since` and `limit` must be integers.")
+        if limit < 1:
+            raise ValidationError("`limit` must be positive.")
+
+        settled = timezone.now() - timedelta(seconds=settings.CHANGE_FEED_SAFETY_LAG)
+        entries = list(ChangeLogEntry.objects.filter(pk__gt=since, created__lte=settled).order_by('pk')[:limit + 1])
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+        return Response({
+            'results': ChangeLogEntrySerializer(entries, many=True).data,
+            'cursor': entries[-1].pk if entries else since,
+            'has_more': has_more,
+        })
+
+
+
+class ReviewExportView(APIView):
+    """
+    This class-based view streams all reviews as CSV or NDJSON for analysts (Admin only).
+    """
+    permission_classes = [IsAdminUser]
+    content_types = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+    def get(self, request):
+        """
+        This method handles GET requests for a review export.
+
+        Parameters:
+        request (Request): The incoming request object with optional `as` (csv or ndjson),
+        `since`/`until` (ISO dates on `created`) and `gzip` query params.
+
+        Returns:
+        StreamingHttpResponse: The export as a file download, produced in constant memory.
+        """
+        export_format = request.query_params.get('as', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            raise ValidationError(f"`as` must be one of: {', '.join(EXPORT_FORMATS)}.")
+        try:
+            since = parse_bound(request.query_params['since']) if 'since' in request.query_params else None
+            until = parse_bound(request.query_params['until']) if 'until' in request.query_params else None
+        except ValueError as exc:
+            raise ValidationError(str(exc))
+        compress = request.query_params.get('gzip') in ('1', 'true')
+
+        filename = f"reviews.{export_format}"
+        content_type = self.content_types[export_format]
+        if compress:
+            filename += '.gz'
+            content_type = 'application/gzip'
+        response = StreamingHttpResponse(
+            export_stream(export_format, since, until, compress=compress), content_type=content_type
+        )
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
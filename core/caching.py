@@ -0,0 +1,107 @@
+"""
+Cache fills with stampede protection.
+
+When a hot key is missing, only one caller (per cache backend) computes it while the others
+wait for the result instead of all hitting the database at once.
+
+Anything another worker has to read back (cached payloads, idempotent responses, profiles)
+needs a shared cache; cache_is_shared tells whether the default cache is one.
+"""
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+POLL_INTERVAL = 0.05
+# Backends whose entries are only visible to the process that wrote them
+LOCAL_CACHE_BACKENDS = ('django.core.cache.backends.locmem.LocMemCache', 'django.core.cache.backends.dummy.DummyCache')
+
+
+def cache_is_shared():
+    """
+    Returns whether the default cache is shared by every worker process, e.g. Redis or Memcached.
+    """
+    return settings.CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+
+
+def single_flight(key, compute, timeout):
+    """
+    Returns the cached value of `key`, computing and storing it under a lock when it is missing.
+
+    Callers that find the lock taken poll for the value for up to CACHE_FILL_WAIT_TIMEOUT
+    seconds and compute it themselves if it still has not appeared. None is never cached.
+
+    Parameters:
+    key (str): The cache key.
+    compute (callable): Builds the value; called without arguments.
+    timeout (int): How long the value is kept, in seconds.
+
+    Returns:
+    object: The cached or freshly computed value.
+    """
+    value = cache.get(key)
+    if value is not None:
+        return value
+
+    lock_key = f"{key}:lock"
+    if cache.add(lock_key, 1, timeout=settings.CACHE_FILL_LOCK_TIMEOUT):
+        try:
+            value = compute()
+            if value is not None:
+                cache.set(key, value, timeout=timeout)
+        finally:
+            cache.delete(lock_key)
+        return value
+
+    deadline = time.monotonic() + settings.CACHE_FILL_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        value = cache.get(key)
+        if value is not None:
+            return value
+        if cache.get(lock_key) is None:
+            break
+    return compute()
+
+
+def single_flight_many(keys, compute_many, timeout):
+    """
+    Returns the cached values of `keys`, computing the missing ones in one call per caller.
+
+    Each missing key is locked separately: the caller computes the keys it could lock and
+    waits, as in single_flight, for the ones another caller is computing. Keys still missing
+    when the wait ends are computed as well. None values are returned but never cached.
+
+    Parameters:
+    keys (list): The cache keys.
+    compute_many (callable): Takes a list of keys and returns a {key: value} dict for all of them.
+    timeout (int): How long the values are kept, in seconds.
+
+    Returns:
+    dict: {key: value} for every key.
+    """
+    values = cache.get_many(keys)
+    missing = [key for key in keys if key not in values]
+    if not missing:
+        return values
+
+    owned = [key for key in missing if cache.add(f"{key}:lock", 1, timeout=settings.CACHE_FILL_LOCK_TIMEOUT)]
+    if owned:
+        try:
+            computed = compute_many(owned)
+            cache.set_many({key: value for key, value in computed.items() if value is not None}, timeout=timeout)
+        finally:
+            cache.delete_many([f"{key}:lock" for key in owned])
+        values.update(computed)
+
+    waiting = [key for key in missing if key not in owned]
+    deadline = time.monotonic() + settings.CACHE_FILL_WAIT_TIMEOUT
+    while waiting and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        values.update(cache.get_many(waiting))
+        locks = cache.get_many([f"{key}:lock" for key in waiting])
+        waiting = [key for key in waiting if key not in values and f"{key}:lock" in locks]
+    waiting = [key for key in missing if key not in values]
+    if waiting:
+        values.update(compute_many(waiting))
+    return values
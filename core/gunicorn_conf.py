@@ -0,0 +1,75 @@
+"""
+Gunicorn configuration for production.
+
+Start it with `manage.py serve` or `gunicorn -c python:core.gunicorn_conf core.wsgi`.
+
+The app is imported once in the master (`preload_app`), warmed up (core/warmup.py), and its
+objects are moved out of the garbage collector's reach with gc.freeze(), so forked workers
+share those pages copy-on-write instead of each building and dirtying its own copy.
+
+Set WARM_CACHE_ON_BOOT=True to also fill the catalogue cache (`manage.py warm_cache`) from the
+master before the workers fork; catalogue caching needs a shared CACHE_BACKEND (see Api/cache.py).
+
+Sizing defaults to (2 x CPUs) + 1 workers with 2 threads each, counting only the CPUs this
+process may run on. Override with WEB_CONCURRENCY / WEB_THREADS, and set WEB_WORKER_CLASS to
+`uvicorn.workers.UvicornWorker` to serve core.asgi (threads are then ignored). The review event
+streams need it: under the default gthread workers they answer 501 instead of pinning a thread.
+With the default in-process REVIEW_EVENTS_BACKEND the master refuses to start more than one
+uvicorn worker (see Api/events.py).
+
+Measured with `manage.py serve --measure --path /api/v1/watchlist/` on the lean production
+settings (Python 3.11, 1 CPU, SQLite), median of three runs:
+
+    boot (import app + URLconf)       ~450 ms, paid once by the master instead of per worker
+    warm-up (core/warmup.py)          ~25 ms
+    private memory per worker         ~41 MB cold, ~11 MB preloaded, ~10 MB preloaded + warm
+    first request of a worker         ~8 ms cold, ~17 ms preloaded, ~12 ms preloaded + warm
+
+A forked worker's first request is slower than in a worker that just booted, because it
+copies the pages it writes to; warm-up moves part of that work into the shared pages.
+"""
+import gc
+import os
+
+
+def cpu_count():
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def default_workers(cpus=None):
+    return 2 * (cpus or cpu_count()) + 1
+
+
+wsgi_app = 'core.wsgi:application'
+bind = os.getenv('BIND', '0.0.0.0:8000')
+preload_app = True
+workers = int(os.getenv('WEB_CONCURRENCY', default_workers()))
+threads = int(os.getenv('WEB_THREADS', '2'))
+worker_class = os.getenv('WEB_WORKER_CLASS', 'gthread')
+timeout = int(os.getenv('WEB_TIMEOUT', '30'))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then so slow leaks cannot grow without bound
+max_requests = int(os.getenv('WEB_MAX_REQUESTS', '2000'))
+max_requests_jitter = max_requests // 10
+accesslog = '-'
+
+
+def when_ready(server):
+    # Runs in the master after the preloaded app is imported and before any worker is forked
+    from core.warmup import warm_up
+
+    if 'uvicorn' in server.cfg.worker_class_str:
+        from Api.events import check_workers
+
+        check_workers(server.cfg.workers)
+
+    if os.getenv('WARM_CACHE_ON_BOOT') == 'True':
+        from django.core.management import call_command
+
+        call_command('warm_cache', workers=1)
+    timings = warm_up()
+    gc.freeze()
+    server.log.info("warm-up done: %s", ", ".join(f"{name} {ms} ms" for name, ms in timings.items()))
@@ -0,0 +1,134 @@
+"""
+`Idempotency-Key` support for POST endpoints.
+
+The first response for a key is stored in the cache and replayed for retries without
+running the view again. A retry that arrives while the first request is still running
+waits for its result instead of executing a second time.
+
+A retry may reach any worker, so keys are only honoured when the default cache is shared
+(see IDEMPOTENCY_KEYS). Otherwise the header is ignored, and check_idempotency_store fails
+`manage.py check --deploy` and `manage.py serve` so the setup is fixed before it ships.
+"""
+import functools
+import hashlib
+import time
+import uuid
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.response import Response
+
+from .caching import cache_is_shared
+
+IDEMPOTENCY_HEADER = 'HTTP_IDEMPOTENCY_KEY'
+POLL_INTERVAL = 0.05
+
+
+def idempotency_enabled():
+    """
+    Returns whether keys are honoured: IDEMPOTENCY_KEYS when set, otherwise whether the default cache is shared.
+    """
+    if settings.IDEMPOTENCY_KEYS is not None:
+        return settings.IDEMPOTENCY_KEYS
+    return cache_is_shared()
+
+
+def check_idempotency_store(app_configs, **kwargs):
+    """
+    Deployment check: fails when keys are ignored because the default cache is private to each worker.
+    """
+    if settings.IDEMPOTENCY_KEYS is not None or cache_is_shared():
+        return []
+    return [checks.Error(
+        "Idempotency-Key headers are ignored: the default cache is private to each worker process.",
+        hint=(
+            "Point CACHE_BACKEND/CACHE_LOCATION at a shared cache (Redis, Memcached), or set IDEMPOTENCY_KEYS=True "
+            "for a single-process server or IDEMPOTENCY_KEYS=False to turn the feature off knowingly."
+        ),
+        id='core.E001',
+    )]
+
+
+def _cache_key(request, key):
+    owner = request.user.pk if request.user.is_authenticated else 'anon'
+    digest = hashlib.sha256(f"{owner}:{request.path}:{key}".encode()).hexdigest()
+    return f"idempotency:{digest}"
+
+
+def _fingerprint(request):
+    return hashlib.sha256(request.body).hexdigest()
+
+
+def _replay(stored, fingerprint):
+    if stored['fingerprint'] != fingerprint:
+        return Response(
+            {'detail': 'Idempotency-Key was already used with a different request body.'},
+            status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+        )
+    return Response(stored['data'], status=stored['status'], headers={'Idempotent-Replayed': 'true'})
+
+
+def idempotent(handler):
+    """
+    Decorates a DRF view handler so requests carrying an `Idempotency-Key` header run at most once.
+
+    Responses below 500 are stored for IDEMPOTENCY_KEY_TTL seconds; server errors are not,
+    so the client can retry them. Requests without the header, or with idempotency disabled
+    (see idempotency_enabled), are handled as usual.
+
+    Parameters:
+    handler (function): The view method to wrap, e.g. `post`.
+
+    Returns:
+    function: The wrapped view method.
+    """
+    @functools.wraps(handler)
+    def wrapper(view, request, *args, **kwargs):
+        key = request.META.get(IDEMPOTENCY_HEADER)
+        if not key or not idempotency_enabled():
+            return handler(view, request, *args, **kwargs)
+
+        result_key = _cache_key(request, key)
+        lock_key = f"{result_key}:lock"
+        fingerprint = _fingerprint(request)
+
+        stored = cache.get(result_key)
+        if stored is not None:
+            return _replay(stored, fingerprint)
+
+        token = uuid.uuid4().hex
+        if not cache.add(lock_key, token, timeout=settings.IDEMPOTENCY_LOCK_TIMEOUT):
+            # Another worker is running this request: wait for its response
+            deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_TIMEOUT
+            while time.monotonic() < deadline:
+                time.sleep(POLL_INTERVAL)
+                stored = cache.get(result_key)
+                if stored is not None:
+                    return _replay(stored, fingerprint)
+                if cache.get(lock_key) is None:
+                    break
+            return Response(
+                {'detail': 'A request with this Idempotency-Key is still being processed.'},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        try:
+            try:
+                response = handler(view, request, *args, **kwargs)
+            except Exception as exc:
+                # Render API errors (e.g. validation) here so they are stored like any other response
+                response = view.handle_exception(exc)
+            if response.status_code < 500:
+                cache.set(
+                    result_key,
+                    {'fingerprint': fingerprint, 'status': response.status_code, 'data': response.data},
+                    timeout=settings.IDEMPOTENCY_KEY_TTL,
+                )
+            return response
+        finally:
+            if cache.get(lock_key) == token:
+                cache.delete(lock_key)
+
+    return wrapper
@@ -0,0 +1,26 @@
+"""
+JSON log formatting, so request and query timings can be filtered and aggregated by field.
+"""
+import json
+import logging
+
+# Attributes every LogRecord has; anything else was passed through `extra=` and is emitted as a field
+RESERVED_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats each record as one JSON object per line, with `extra=` values as top-level keys.
+    """
+
+    def format(self, record):
+        payload = {
+            'time': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        payload.update((key, value) for key, value in vars(record).items() if key not in RESERVED_ATTRS)
+        if record.exc_info:
+            payload['exc_info'] = self.formatException(record.exc_info)
+        return json.dumps(payload, default=str)
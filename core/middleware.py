@@ -0,0 +1,231 @@
+import logging
+import random
+import re
+import time
+
+from django.conf import settings
+from django.db import connection
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is used when it is missing
+    brotli = None
+
+from .profiling import CallProfiler, QueryCollector, build_report, embed_report, normalize_sql, store_report
+
+logger = logging.getLogger(__name__)
+slow_request_logger = logging.getLogger('core.slow_requests')
+slow_query_logger = logging.getLogger('core.slow_queries')
+
+re_accepts_br = re.compile(r"\bbr\b")
+
+# Event streams must reach the client as soon as each event is written; gzip files are already compressed
+UNCOMPRESSED_CONTENT_TYPES = ('text/event-stream', 'application/gzip')
+
+
+def brotli_compress_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+async def brotli_compress_async_sequence(sequence, quality):
+    compressor = brotli.Compressor(quality=quality)
+    async for item in sequence:
+        data = compressor.process(item) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Compresses responses with brotli when the client and the server support it, gzip otherwise.
+
+    Bodies below COMPRESSION_MIN_SIZE bytes are sent as is, since compressing them costs
+    more CPU than it saves on the wire. Streaming responses are compressed chunk by chunk,
+    except event streams. The size and CPU time of each compressed body is logged at DEBUG
+    level on `core.middleware` so the threshold can be tuned per endpoint.
+    """
+
+    def process_response(self, request, response):
+        if response.get('Content-Type', '').startswith(UNCOMPRESSED_CONTENT_TYPES):
+            return response
+        if not response.streaming and len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+        if response.has_header('Content-Encoding'):
+            return response
+
+        raw_size = None if response.streaming else len(response.content)
+        start = time.process_time()
+        if brotli is not None and re_accepts_br.search(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            response = self.compress_brotli(response)
+        else:
+            response = super().process_response(request, response)
+
+        if raw_size is not None and response.has_header('Content-Encoding'):
+            logger.debug(
+                "compressed %s %s: %d -> %d bytes in %.2f ms CPU",
+                response['Content-Encoding'], request.path, raw_size, len(response.content),
+                (time.process_time() - start) * 1000,
+            )
+        return response
+
+    def compress_brotli(self, response):
+        patch_vary_headers(response, ('Accept-Encoding',))
+        quality = settings.BROTLI_QUALITY
+
+        if response.streaming:
+            if response.is_async:
+                response.streaming_content = brotli_compress_async_sequence(response.streaming_content, quality)
+            else:
+                response.streaming_content = brotli_compress_sequence(response.streaming_content, quality)
+            del response.headers['Content-Length']
+        else:
+            compressed_content = brotli.compress(response.content, quality=quality)
+            if len(compressed_content) >= len(response.content):
+                return response
+            response.content = compressed_content
+            response.headers['Content-Length'] = str(len(response.content))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+class QueryTimer:
+    """
+    `connection.execute_wrapper` hook that counts statements and keeps the ones slower than the threshold.
+    """
+
+    def __init__(self, threshold_ms):
+        self.threshold_ms = threshold_ms
+        self.count = 0
+        self.slow = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - start) * 1000
+            self.count += 1
+            if duration_ms >= self.threshold_ms:
+                self.slow.append((sql, len(params) if params else 0, duration_ms))
+
+
+class SlowRequestLogMiddleware:
+    """
+    Logs requests slower than their route's threshold on `core.slow_requests`, and statements
+    slower than SLOW_QUERY_THRESHOLD_MS on `core.slow_queries`, with view name and user id.
+
+    Thresholds are in milliseconds: SLOW_REQUEST_ROUTE_THRESHOLDS maps URL route patterns to
+    their own threshold (None never logs, e.g. for event streams) and SLOW_REQUEST_THRESHOLD_MS
+    covers the rest. Only a SLOW_LOG_SAMPLE_RATE fraction of requests is timed at all, so the
+    rate can be lowered under heavy load. Streaming responses are timed up to the first byte.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if random.random() >= settings.SLOW_LOG_SAMPLE_RATE:
+            return self.get_response(request)
+
+        timer = QueryTimer(settings.SLOW_QUERY_THRESHOLD_MS)
+        start = time.perf_counter()
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        duration_ms = (time.perf_counter() - start) * 1000
+
+        match = request.resolver_match
+        route = match.route if match else None
+        threshold_ms = settings.SLOW_REQUEST_ROUTE_THRESHOLDS.get(route, settings.SLOW_REQUEST_THRESHOLD_MS)
+        is_slow_request = threshold_ms is not None and duration_ms >= threshold_ms
+        if not timer.slow and not is_slow_request:
+            return response
+
+        user = getattr(request, 'user', None)
+        context = {
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'user_id': user.pk if user is not None and user.is_authenticated else None,
+        }
+        for sql, param_count, query_ms in timer.slow:
+            slow_query_logger.warning("slow query", extra={
+                'event': 'slow_query', 'sql': normalize_sql(sql), 'params': param_count,
+                'duration_ms': round(query_ms, 2), **context,
+            })
+        if is_slow_request:
+            slow_request_logger.warning("slow request", extra={
+                'event': 'slow_request', 'method': request.method, 'route': route,
+                'status': response.status_code, 'duration_ms': round(duration_ms, 2),
+                'threshold_ms': threshold_ms, 'query_count': timer.count, **context,
+            })
+        return response
+
+
+class QueryProfilerMiddleware:
+    """
+    Profiles a single request when an admin sends the `X-Profile` header.
+
+    `X-Profile: 1` records every SQL statement with its duration and originating project
+    line and groups repeated statements (N+1 patterns); `X-Profile: calls` also records a
+    cProfile call tree. JSON responses embed the report in their body; with a shared cache it
+    is also stored (see core/profiling.py) and its id returned in `X-Profile-Id`. Every
+    profiled response carries a one-line `X-Profile-Summary`. Requests without the header, or
+    from non-admins, pay nothing beyond the header lookup.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = request.headers.get('X-Profile', '').strip().lower()
+        if mode not in ('1', 'calls') or not self.is_admin(request):
+            return self.get_response(request)
+
+        collector = QueryCollector()
+        call_profiler = CallProfiler() if mode == 'calls' else None
+        start = time.perf_counter()
+        with connection.execute_wrapper(collector):
+            if call_profiler is not None:
+                with call_profiler:
+                    response = self.get_response(request)
+            else:
+                response = self.get_response(request)
+        elapsed = time.perf_counter() - start
+
+        report = build_report(request, response, collector, elapsed, call_profiler)
+        if store_report(report):
+            response['X-Profile-Id'] = report['id']
+        embed_report(response, report)
+        response['X-Profile-Summary'] = (
+            f"queries={report['query_count']}; duplicates={sum(group['count'] for group in report['duplicates'])}; "
+            f"sql_ms={report['query_ms']}; total_ms={report['total_ms']}"
+        )
+        return response
+
+    def is_admin(self, request):
+        # DRF authenticates JWTs inside the view, so run its authentication classes here as well
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_staff:
+            return True
+        from rest_framework.exceptions import AuthenticationFailed
+        from rest_framework.settings import api_settings
+
+        for authentication_class in api_settings.DEFAULT_AUTHENTICATION_CLASSES:
+            try:
+                authenticated = authentication_class().authenticate(request)
+            except AuthenticationFailed:
+                return False
+            if authenticated is not None:
+                return authenticated[0].is_staff
+        return False
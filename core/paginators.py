@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+# Below this many rows an exact COUNT(*) is cheap enough to run
+ESTIMATE_THRESHOLD = 100_000
+
+
+def estimate_count(queryset):
+    """
+    Returns the row count of a queryset, using the planner's estimate for huge unfiltered tables.
+
+    Only PostgreSQL keeps a usable estimate (pg_class.reltuples); other backends and filtered
+    querysets fall back to an exact count.
+
+    Parameters:
+    queryset (QuerySet): The queryset to count.
+
+    Returns:
+    int: The estimated or exact number of rows.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor == 'postgresql' and not queryset.query.where:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT reltuples FROM pg_class WHERE relname = %s", [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        if row and row[0] >= ESTIMATE_THRESHOLD:
+            return int(row[0])
+    return queryset.count()
+
+
+def cached_estimate_count(queryset):
+    """
+    Returns estimate_count() for an unfiltered queryset, cached for ESTIMATED_COUNT_CACHE_TIMEOUT seconds.
+
+    Parameters:
+    queryset (QuerySet): The unfiltered queryset to count.
+
+    Returns:
+    int: The estimated or exact number of rows.
+    """
+    key = f"estimated-count:{queryset.db}:{queryset.model._meta.db_table}"
+    count = cache.get(key)
+    if count is None:
+        count = estimate_count(queryset)
+        cache.set(key, count, timeout=settings.ESTIMATED_COUNT_CACHE_TIMEOUT)
+    return count
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that avoids a full COUNT(*) on huge unfiltered tables.
+    """
+
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            return estimate_count(self.object_list)
+        return super().count
@@ -0,0 +1,183 @@
+"""
+On-demand request profiling for production debugging.
+
+An admin sends `X-Profile: 1` (or `X-Profile: calls` to also get a cProfile call tree) and
+the request's SQL statements are captured with their timings and the project line that
+issued them. JSON responses carry the report with them: the body comes back as
+`{"response": <original body>, "profile": <report>}`. With a shared cache the report is also
+stored for PROFILE_TTL seconds and can be read back from /api/v1/profiles/<id>/ using the id
+returned in the `X-Profile-Id` header; a per-process cache is not used, since the follow-up
+request would usually reach another worker.
+"""
+import json
+import cProfile
+import io
+import pstats
+import re
+import time
+import traceback
+import uuid
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.exceptions import NotFound
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .caching import cache_is_shared
+
+PROJECT_ROOT = str(settings.BASE_DIR)
+# The profiler's own frames wrap every query, so they never count as its origin
+PROFILER_MODULES = ('core/profiling.py', 'core/middleware.py')
+CALL_TREE_LINES = 40
+
+re_in_list = re.compile(r"IN \((?:%s, )*%s\)")
+re_literal = re.compile(r"'(?:[^']|'')*'|\b\d+\b")
+re_whitespace = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """
+    Reduces a statement to its shape: literals become `?` and IN lists of any length collapse to `IN (...)`.
+    """
+    sql = re_in_list.sub('IN (...)', sql)
+    sql = re_literal.sub('?', sql)
+    return re_whitespace.sub(' ', sql).strip()
+
+
+def _origin():
+    """
+    Returns the innermost project frame (view, serializer, ...) that led to the current query.
+    """
+    for frame in reversed(traceback.extract_stack()[:-2]):
+        if frame.filename.startswith(PROJECT_ROOT) and 'site-packages' not in frame.filename \
+                and not frame.filename.endswith(PROFILER_MODULES):
+            return f"{frame.filename[len(PROJECT_ROOT) + 1:]}:{frame.lineno} in {frame.name}"
+    return None
+
+
+class QueryCollector:
+    """
+    `connection.execute_wrapper` hook that records every statement run during a request.
+    """
+
+    def __init__(self):
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append({
+                'sql': sql,
+                'params': len(params) if params else 0,
+                'ms': round((time.perf_counter() - start) * 1000, 3),
+                'origin': _origin(),
+            })
+
+    def duplicates(self):
+        """
+        Groups statements that ran more than once with the same shape (the N+1 signature).
+        """
+        groups = defaultdict(list)
+        for query in self.queries:
+            groups[normalize_sql(query['sql'])].append(query)
+        return [
+            {
+                'sql': sql,
+                'count': len(queries),
+                'ms': round(sum(query['ms'] for query in queries), 3),
+                'origins': sorted({query['origin'] for query in queries if query['origin']}),
+            }
+            for sql, queries in sorted(groups.items(), key=lambda item: -len(item[1]))
+            if len(queries) > 1
+        ]
+
+
+class CallProfiler:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def __enter__(self):
+        self.profile.enable()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profile.disable()
+
+    def report(self):
+        output = io.StringIO()
+        pstats.Stats(self.profile, stream=output).sort_stats('cumulative').print_stats(CALL_TREE_LINES)
+        return output.getvalue()
+
+
+def build_report(request, response, collector, elapsed, call_profiler=None):
+    """
+    Assembles the profile report of a request.
+
+    Returns:
+    dict: The report, with a fresh `id`.
+    """
+    report = {
+        'id': uuid.uuid4().hex,
+        'method': request.method,
+        'path': request.get_full_path(),
+        'status': response.status_code,
+        'total_ms': round(elapsed * 1000, 3),
+        'query_count': len(collector.queries),
+        'query_ms': round(sum(query['ms'] for query in collector.queries), 3),
+        'duplicates': collector.duplicates(),
+        'queries': collector.queries,
+    }
+    if call_profiler is not None:
+        report['call_tree'] = call_profiler.report()
+    return report
+
+
+def store_report(report):
+    """
+    Saves a profile report in the cache when every worker can read it back.
+
+    Returns:
+    bool: Whether the report was stored.
+    """
+    if not cache_is_shared():
+        return False
+    cache.set(f"profile:{report['id']}", report, timeout=settings.PROFILE_TTL)
+    return True
+
+
+def embed_report(response, report):
+    """
+    Wraps a JSON response body as `{"response": ..., "profile": ...}`; other responses are left alone.
+
+    Returns:
+    bool: Whether the report was embedded.
+    """
+    if response.streaming or not response.get('Content-Type', '').startswith('application/json'):
+        return False
+    body = json.loads(response.content) if response.content else None
+    response.content = json.dumps({'response': body, 'profile': report}, cls=DjangoJSONEncoder)
+    if response.has_header('Content-Length'):
+        response['Content-Length'] = str(len(response.content))
+    if response.has_header('ETag'):
+        # The validator described the original body
+        del response['ETag']
+    return True
+
+
+class ProfileView(APIView):
+    """
+    This class-based view returns a stored request profile (Admin only).
+    """
+    permission_classes = [IsAdminUser]
+
+    def get(self, request, profile_id):
+        report = cache.get(f"profile:{profile_id}")
+        if report is None:
+            raise NotFound("Profile not found or expired.")
+        return Response(report)
@@ -0,0 +1,148 @@
+"""
+Precomputed OpenAPI schema for the project.
+
+Generating the schema introspects every view and serializer, so it is rendered once
+into a file named after a fingerprint of the modules it is built from, and then served
+from memory with an ETag. The file is regenerated only when that fingerprint changes.
+"""
+import hashlib
+import threading
+import time
+
+import drf_yasg
+import rest_framework
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+from drf_yasg import openapi
+from drf_yasg.codecs import OpenAPICodecJson
+from drf_yasg.generators import OpenAPISchemaGenerator
+from drf_yasg.views import get_schema_view
+from rest_framework import permissions
+
+API_INFO = openapi.Info(
+    title="Django REST",
+    default_version='v1',
+    description="Test description",
+    terms_of_service="https://www.yourapp.com/terms/",
+    contact=openapi.Contact(email="contact@yourapp.com"),
+    license=openapi.License(name="BSD License"),
+)
+
+schema_view = get_schema_view(
+    API_INFO,
+    public=True,
+    permission_classes=(permissions.AllowAny,),
+)
+
+# Every module of these packages is hashed: views, serializers, pagination, authentication and
+# settings all shape the schema. Migrations only replay models.py and are skipped
+SCHEMA_PACKAGES = ('core', 'Api', 'users')
+SCHEMA_SKIPPED_DIRS = ('migrations',)
+
+_lock = threading.Lock()
+_document = None
+
+
+def schema_fingerprint():
+    """
+    Hashes the project modules and the DRF and drf-yasg versions the schema is generated from.
+
+    Returns:
+    str: A short hex digest that changes whenever one of those modules or versions changes.
+    """
+    digest = hashlib.sha256(f"{rest_framework.VERSION}:{drf_yasg.__version__}".encode())
+    for package in SCHEMA_PACKAGES:
+        root = settings.BASE_DIR / package
+        for path in sorted(root.rglob('*.py')):
+            if not set(SCHEMA_SKIPPED_DIRS).intersection(path.relative_to(root).parts):
+                digest.update(str(path.relative_to(settings.BASE_DIR)).encode())
+                digest.update(path.read_bytes())
+    return digest.hexdigest()[:16]
+
+
+def generate_schema():
+    """
+    Introspects the URLconf and renders the public schema as JSON.
+
+    Returns:
+    bytes: The encoded schema.
+    """
+    generator = OpenAPISchemaGenerator(API_INFO)
+    schema = generator.get_schema(request=None, public=True)
+    return OpenAPICodecJson(validators=[]).encode(schema)
+
+
+def write_schema(force=False):
+    """
+    Writes the schema file for the current fingerprint unless it already exists.
+
+    Parameters:
+    force (bool): Regenerate the file even if it exists.
+
+    Returns:
+    tuple: The fingerprint and the path of the schema file.
+    """
+    fingerprint = schema_fingerprint()
+    path = settings.SCHEMA_CACHE_DIR / f"swagger-{fingerprint}.json"
+    if force or not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp')
+        tmp_path.write_bytes(generate_schema())
+        tmp_path.replace(path)
+    return fingerprint, path
+
+
+def get_schema_document():
+    """
+    Returns the schema for this process, loading or generating it on first use.
+
+    Returns:
+    tuple: The fingerprint (used as ETag) and the encoded schema.
+    """
+    global _document
+    if _document is None:
+        with _lock:
+            if _document is None:
+                fingerprint, path = write_schema()
+                _document = (fingerprint, path.read_bytes())
+    return _document
+
+
+@require_safe
+@cache_control(public=True, max_age=settings.SCHEMA_CACHE_MAX_AGE)
+@condition(etag_func=lambda request: get_schema_document()[0])
+def schema_json(request):
+    """
+    Serves the precomputed schema, answering conditional requests with 304.
+    """
+    return HttpResponse(get_schema_document()[1], content_type='application/json')
+
+
+def measure_latency(iterations=5):
+    """
+    Compares generating the schema per hit (the old behaviour) with serving the precomputed file.
+
+    Parameters:
+    iterations (int): The number of timed runs of each path.
+
+    Returns:
+    dict: The mean latency in milliseconds of each path.
+    """
+    from django.test import RequestFactory
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        generate_schema()
+    generated = (time.perf_counter() - start) / iterations
+
+    get_schema_document()
+    request = RequestFactory().get('/swagger.json')
+    start = time.perf_counter()
+    for _ in range(iterations):
+        schema_json(request)
+    served = (time.perf_counter() - start) / iterations
+
+    return {'generated_ms': generated * 1000, 'precomputed_ms': served * 1000}
@@ -11,12 +11,14 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 """
 
 from pathlib import Path
-import dotenv
 import os 
 from datetime import timedelta
 
 
-dotenv.load_dotenv()
+# Deployments that inject the environment directly can skip importing dotenv
+if os.getenv('DJANGO_READ_DOTENV', 'True') == 'True':
+    import dotenv
+    dotenv.load_dotenv()
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -56,12 +58,15 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
+    "core.middleware.SlowRequestLogMiddleware",
+    "core.middleware.CompressionMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "core.middleware.QueryProfilerMiddleware",
 ]
 
 ROOT_URLCONF = "core.urls"
@@ -134,7 +139,7 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.tokens.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSIONS_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -144,8 +149,9 @@ REST_FRAMEWORK = {
         'rest_framework.throttling.AnonRateThrottle',
     ],
     'DEFAULT_THROTTLE_RATES': {
-        'user': '1000/day', 
-        'anon': '10/hour',  
+        'user': os.getenv('THROTTLE_USER_RATE', '1000/day'),
+        'anon': os.getenv('THROTTLE_ANON_RATE', '10/hour'),
+        'review_events': os.getenv('THROTTLE_REVIEW_EVENTS_RATE', '30/hour'),
     }
 }
 
@@ -160,6 +166,94 @@ SIMPLE_JWT = {
     'ALGORITHM': 'HS256',
     'SIGNING_KEY': SECRET_KEY,
     'AUTH_HEADER_TYPES': ('Bearer',),
+    'TOKEN_OBTAIN_SERIALIZER': 'users.tokens.ClaimsTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.tokens.ClaimsTokenRefreshSerializer',
+}
+
+# Outstanding refresh tokens are queued and bulk inserted after the response (see users/tokens.py)
+TOKEN_OUTSTANDING_BATCH_SIZE = 500
+TOKEN_OUTSTANDING_FLUSH_INTERVAL = 5
+
+# The swagger/redoc pages load the precomputed schema instead of regenerating it per hit
+SWAGGER_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+REDOC_SETTINGS = {
+    'SPEC_URL': 'schema-json',
+}
+SCHEMA_CACHE_DIR = BASE_DIR / 'schema'
+SCHEMA_CACHE_MAX_AGE = 60 * 60
+
+# Response compression (see core/middleware.py); tune with `manage.py measure_compression`
+COMPRESSION_MIN_SIZE = 1024
+BROTLI_QUALITY = 4
+
+# Idempotency keys, cached payloads and profiles live here. The default in-process cache is private to each
+# worker; point CACHE_BACKEND/CACHE_LOCATION at Redis or Memcached to share them across workers and hosts
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    },
+}
+
+# The change feed (/api/v1/changes/) only serves entries at least this many seconds old, so entries whose
+# transaction commits after a later one's are not skipped; keep it above the longest catalogue write transaction
+CHANGE_FEED_SAFETY_LAG = int(os.getenv('CHANGE_FEED_SAFETY_LAG', '5'))
+
+# Idempotency-Key handling for retried POSTs (see core/idempotency.py). A retry may reach any worker, so keys are
+# only honoured with a shared CACHE_BACKEND; IDEMPOTENCY_KEYS=True/False overrides that (e.g. single-process setups).
+# Leaving it unset with a per-process cache fails `manage.py check --deploy` and `manage.py serve`. Timeouts in seconds
+IDEMPOTENCY_KEYS = {'True': True, 'False': False}.get(os.getenv('IDEMPOTENCY_KEYS'))
+IDEMPOTENCY_KEY_TTL = 60 * 60 * 24
+IDEMPOTENCY_LOCK_TIMEOUT = 30
+IDEMPOTENCY_WAIT_TIMEOUT = 10
+
+# Server-sent review events (see Api/events.py); the in-process backend only allows one ASGI worker,
+# swap it for a shared one to run several workers or nodes.
+# Streams are only served by the ASGI application (`manage.py serve --asgi`) and need an authenticated user
+REVIEW_EVENTS_BACKEND = 'Api.events.InProcessBroker'
+REVIEW_STREAM_BUFFER = 100
+REVIEW_STREAM_HEARTBEAT = 15
+
+# Per-request profiles requested with the X-Profile header (see core/profiling.py), kept for this many seconds
+# when the cache is shared; JSON responses also embed them
+PROFILE_TTL = 60 * 10
+
+# Cached catalogue payloads (see Api/cache.py and core/caching.py), in seconds. A miss is filled by one
+# caller holding a lock for up to CACHE_FILL_LOCK_TIMEOUT while the others wait up to CACHE_FILL_WAIT_TIMEOUT.
+# Payloads are only cached with a shared CACHE_BACKEND: with the in-process default a write would only
+# invalidate the worker that handled it. CATALOGUE_CACHE=True/False overrides that (e.g. single-process setups)
+CATALOGUE_CACHE = {'True': True, 'False': False}.get(os.getenv('CATALOGUE_CACHE'))
+CATALOGUE_CACHE_TIMEOUT = 60 * 5
+CACHE_FILL_LOCK_TIMEOUT = 10
+CACHE_FILL_WAIT_TIMEOUT = 5
+
+# How long table-size estimates for paginated admin listings are reused, in seconds (see core/paginators.py)
+ESTIMATED_COUNT_CACHE_TIMEOUT = 60 * 5
+
+# Slow request/query logging (see core/middleware.py), in milliseconds; routes use Django's route patterns
+SLOW_REQUEST_THRESHOLD_MS = int(os.getenv('SLOW_REQUEST_THRESHOLD_MS', '500'))
+SLOW_REQUEST_ROUTE_THRESHOLDS = {
+    'api/v1/reviews/export/': 30000,
+    'api/v1/stream/<int:pk>/review/events/': None,
+}
+SLOW_QUERY_THRESHOLD_MS = int(os.getenv('SLOW_QUERY_THRESHOLD_MS', '100'))
+SLOW_LOG_SAMPLE_RATE = float(os.getenv('SLOW_LOG_SAMPLE_RATE', '1.0'))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'json': {'()': 'core.jsonlog.JSONFormatter'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'json'},
+    },
+    'loggers': {
+        name: {'handlers': ['console'], 'level': os.getenv('LOG_LEVEL', 'INFO'), 'propagate': False}
+        for name in ('core', 'Api', 'users')
+    },
 }
 
 AUTH_USER_MODEL = 'users.User'
@@ -0,0 +1,28 @@
+"""
+Lean production settings for core project.
+
+Use with DJANGO_SETTINGS_MODULE=core.settings_production. Dev-only apps (drf_yasg and
+the browsable API) are dropped so workers import less on startup, and dotenv is only
+read when DJANGO_READ_DOTENV is explicitly set.
+"""
+
+import os
+
+os.environ.setdefault('DJANGO_READ_DOTENV', 'False')
+
+from .settings import *  # noqa: E402,F401,F403
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host for host in os.getenv('ALLOWED_HOSTS', '').split(',') if host]
+
+DEV_ONLY_APPS = ['drf_yasg']
+
+INSTALLED_APPS = [app for app in INSTALLED_APPS if app not in DEV_ONLY_APPS]
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': (
+        'rest_framework.renderers.JSONRenderer',
+    ),
+}
@@ -0,0 +1,19 @@
+"""
+Shared test case for the project's apps.
+"""
+from django.core.cache import cache
+from django.test import TestCase
+
+
+class CacheIsolatedTestCase(TestCase):
+    """
+    TestCase that starts every test with an empty default cache.
+
+    Cached payloads, idempotency keys, throttle counters and count estimates are not rolled
+    back with the database, and primary keys are reused between tests, so entries left by one
+    test would otherwise be served to the next. Subclasses overriding setUp call super().setUp().
+    """
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
@@ -14,33 +14,25 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
-from rest_framework import permissions
-from drf_yasg.views import get_schema_view
-from drf_yasg import openapi
 
-schema_view = get_schema_view(
-   openapi.Info(
-      title="Django REST",
-      default_version='v1',
-      description="Test description",
-      terms_of_service="https://www.yourapp.com/terms/",
-      contact=openapi.Contact(email="contact@yourapp.com"),
-      license=openapi.License(name="BSD License"),
-   ),
-   public=True,
-   permission_classes=(permissions.AllowAny,),
-)
+from core.profiling import ProfileView
 
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/", include('Api.urls')),
     path("api/v1/", include('users.urls')),
-    path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
-    path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
-    path('swagger.json', schema_view.without_ui(cache_timeout=0), name='schema-json'),
-   
-
-   
+    path("api/v1/profiles/<str:profile_id>/", ProfileView.as_view(), name='profile-detail'),
 ]
+
+# drf_yasg is a dev-only app and left out of the production settings
+if 'drf_yasg' in settings.INSTALLED_APPS:
+    from core.schema import schema_json, schema_view
+
+    urlpatterns += [
+        path('swagger/', schema_view.with_ui('swagger', cache_timeout=0), name='schema-swagger-ui'),
+        path('redoc/', schema_view.with_ui('redoc', cache_timeout=0), name='schema-redoc'),
+        path('swagger.json', schema_json, name='schema-json'),
+    ]
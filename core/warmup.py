@@ -0,0 +1,79 @@
+"""
+Boot-time warm-up for production workers.
+
+Run once in the gunicorn master (see core/gunicorn_conf.py) after the app is loaded and
+before workers fork. The caches filled here are then shared copy-on-write instead of being
+rebuilt by every worker on its first requests. Nothing in here touches the database, so no
+connection is inherited by the forked workers.
+"""
+import time
+
+from django.apps import apps
+from django.contrib.auth.hashers import get_hasher
+from django.db import connections
+from django.urls import get_resolver
+from rest_framework.serializers import Serializer
+from rest_framework.settings import api_settings
+
+PROJECT_PACKAGES = ('Api', 'users', 'core')
+
+
+def _subclasses(cls):
+    for subclass in cls.__subclasses__():
+        yield subclass
+        yield from _subclasses(subclass)
+
+
+def warm_orm():
+    # Field maps, reverse relations and the SQL compiler of each model's default queryset
+    for model in apps.get_models():
+        model._meta.get_fields()
+        model._meta._relation_tree
+        str(model._default_manager.all().query)
+
+
+def warm_urls():
+    resolver = get_resolver()
+    resolver.reverse_dict
+    resolver.namespace_dict
+    resolver.app_dict
+
+
+def warm_serializers():
+    # Builds every project serializer's fields once, importing validators and compiling their patterns
+    for serializer_class in _subclasses(Serializer):
+        if serializer_class.__module__.split('.')[0] in PROJECT_PACKAGES:
+            serializer_class().fields
+
+
+def warm_rest_framework():
+    # api_settings resolves import strings lazily on first access; the JWT backend and hasher are built on first login
+    for name in ('DEFAULT_AUTHENTICATION_CLASSES', 'DEFAULT_PERMISSION_CLASSES', 'DEFAULT_RENDERER_CLASSES',
+                 'DEFAULT_PARSER_CLASSES', 'DEFAULT_THROTTLE_CLASSES', 'DEFAULT_CONTENT_NEGOTIATION_CLASS'):
+        getattr(api_settings, name)
+    from rest_framework_simplejwt.state import token_backend  # noqa: F401
+    get_hasher()
+
+
+WARMERS = (
+    ('orm', warm_orm),
+    ('urls', warm_urls),
+    ('serializers', warm_serializers),
+    ('rest_framework', warm_rest_framework),
+)
+
+
+def warm_up():
+    """
+    Fills Django and DRF caches that are otherwise built lazily on the first requests.
+
+    Returns:
+    dict: Milliseconds spent per stage.
+    """
+    timings = {}
+    for name, warmer in WARMERS:
+        start = time.perf_counter()
+        warmer()
+        timings[name] = round((time.perf_counter() - start) * 1000, 2)
+    connections.close_all()
+    return timings
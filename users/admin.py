@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
+from core.paginators import EstimatedCountPaginator
 from .models import User
 
 class UserAdmin(BaseUserAdmin):
@@ -19,9 +20,13 @@ class UserAdmin(BaseUserAdmin):
             'fields': ('email', 'username', 'first_name', 'last_name', 'password1', 'password2'),
         }),
     )
-    search_fields = ('email', 'username')
+    # Case-sensitive prefix searches on the unique (indexed) columns instead of full-table icontains scans;
+    # istartswith (`^`) compares UPPER(col), which those indexes cannot serve on PostgreSQL
+    search_fields = ('email__startswith', 'username__startswith')
     ordering = ('email',)
     filter_horizontal = ()
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
 
 # Register the User model with the custom UserAdmin
 admin.site.register(User, UserAdmin)
@@ -4,3 +4,13 @@ from django.apps import AppConfig
 class UsersConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "users"
+
+    def ready(self):
+        from django.core.signals import request_finished
+        from django.db.models.signals import post_delete, post_save
+
+        from .tokens import flush_outstanding_tokens, revoke_tokens_of_deleted_user, revoke_tokens_of_inactive_user
+
+        request_finished.connect(flush_outstanding_tokens, dispatch_uid='users.flush_outstanding_tokens')
+        post_save.connect(revoke_tokens_of_inactive_user, sender=self.get_model('User'), dispatch_uid='users.revoke_inactive')
+        post_delete.connect(revoke_tokens_of_deleted_user, sender=self.get_model('User'), dispatch_uid='users.revoke_deleted')
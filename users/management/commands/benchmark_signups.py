@@ -0,0 +1,68 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework.exceptions import ValidationError
+
+from users.serializers import RegisterSerializer
+
+# Cheap hasher used with --cheap-hash, to show the database share of a signup without the password hash
+CHEAP_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+
+class Command(BaseCommand):
+    """
+    Measures signups per second through RegisterSerializer, the code path of POST /api/v1/signup/.
+
+    Each run registers `--count` new users named `<prefix>-<n>` and then `--count` duplicates
+    of them, reporting throughput and queries per signup for both; the users are deleted
+    afterwards unless `--keep` is given. With `--cheap-hash` the password hasher is swapped
+    for MD5 so the validation and database cost is not hidden behind the hash.
+    """
+    help = "Benchmark user registration throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=50)
+        parser.add_argument('--prefix', default='bench-signup')
+        parser.add_argument('--cheap-hash', action='store_true')
+        parser.add_argument('--keep', action='store_true')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        prefix = options['prefix']
+        User.objects.filter(username__startswith=f"{prefix}-").delete()
+        payloads = [
+            {'username': f"{prefix}-{n}", 'email': f"{prefix}-{n}@example.com", 'password': 'a-Strong-pass-42'}
+            for n in range(options['count'])
+        ]
+        try:
+            if options['cheap_hash']:
+                with override_settings(PASSWORD_HASHERS=CHEAP_HASHERS):
+                    self.run('new users', payloads)
+                    self.run('duplicates', payloads)
+            else:
+                self.run('new users', payloads)
+                self.run('duplicates', payloads)
+        finally:
+            if not options['keep']:
+                User.objects.filter(username__startswith=f"{prefix}-").delete()
+
+    def run(self, label, payloads):
+        created = 0
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for payload in payloads:
+                serializer = RegisterSerializer(data=payload)
+                serializer.is_valid(raise_exception=True)
+                try:
+                    serializer.save()
+                    created += 1
+                except ValidationError:
+                    pass
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}: {len(payloads)} signups ({created} created) in {elapsed:.2f}s, "
+            f"{len(payloads) / elapsed:.1f} signups/s, {len(queries) / len(payloads):.1f} queries each"
+        ))
@@ -0,0 +1,85 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from users.serializers import LoginSerializer
+from users.tokens import ClaimsTokenRefreshSerializer, issue_tokens, outstanding_tokens
+from .benchmark_signups import CHEAP_HASHERS
+
+PASSWORD = 'a-Strong-pass-42'
+
+
+class Command(BaseCommand):
+    """
+    Measures login and refresh throughput of the token service against plain simplejwt.
+
+    Logins run LoginSerializer plus token issuance, refreshes run the rotation serializer
+    (blacklisting the previous refresh token). Queued outstanding tokens are flushed inside
+    the timed section, so the comparison includes their bookkeeping. With `--cheap-hash` the
+    password hasher is swapped for MD5 so the token cost is not hidden behind the hash.
+    """
+    help = "Benchmark login and refresh throughput."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=200)
+        parser.add_argument('--email', default='bench-token@example.com')
+        parser.add_argument('--cheap-hash', action='store_true')
+
+    def handle(self, *args, **options):
+        if options['cheap_hash']:
+            with override_settings(PASSWORD_HASHERS=CHEAP_HASHERS):
+                self.benchmark(options)
+        else:
+            self.benchmark(options)
+
+    def benchmark(self, options):
+        User = get_user_model()
+        User.objects.filter(email=options['email']).delete()
+        User.objects.create_user(email=options['email'], username=options['email'].split('@')[0], password=PASSWORD)
+        credentials = {'email': options['email'], 'password': PASSWORD}
+
+        def simplejwt_login():
+            serializer = LoginSerializer(data=credentials)
+            serializer.is_valid(raise_exception=True)
+            refresh = RefreshToken.for_user(serializer.validated_data)
+            return {'refresh': str(refresh), 'access': str(refresh.access_token)}
+
+        def service_login():
+            serializer = LoginSerializer(data=credentials)
+            serializer.is_valid(raise_exception=True)
+            return issue_tokens(serializer.validated_data)
+
+        try:
+            for label, login, refresh_serializer in (
+                ('simplejwt', simplejwt_login, TokenRefreshSerializer),
+                ('token service', service_login, ClaimsTokenRefreshSerializer),
+            ):
+                self.run(f"{label} login", options['count'], login)
+                token = login()['refresh']
+
+                def refresh():
+                    nonlocal token
+                    serializer = refresh_serializer(data={'refresh': token})
+                    serializer.is_valid(raise_exception=True)
+                    token = serializer.validated_data['refresh']
+
+                self.run(f"{label} refresh", options['count'], refresh)
+        finally:
+            outstanding_tokens.flush()
+            User.objects.filter(email=options['email']).delete()
+
+    def run(self, label, count, operation):
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(count):
+                operation()
+            outstanding_tokens.flush()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{label}: {count} in {elapsed:.2f}s, {count / elapsed:.1f}/s, {len(queries) / count:.2f} queries each"
+        ))
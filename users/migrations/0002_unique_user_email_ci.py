@@ -0,0 +1,38 @@
+# Generated by Django 5.0.14 on 2026-10-19 04:09
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_case_duplicate_emails(apps, schema_editor):
+    """
+    Stops the migration when accounts exist whose emails differ only in case.
+    Unlike catalogue rows they cannot be merged automatically; resolve them by hand first.
+    """
+    User = apps.get_model('users', 'User')
+    duplicates = list(
+        User.objects.annotate(email_lower=Lower('email')).values('email_lower')
+        .annotate(total=Count('pk')).filter(total__gt=1).order_by().values_list('email_lower', flat=True)[:20]
+    )
+    if duplicates:
+        raise RuntimeError(
+            "Cannot add unique_user_email_ci, these emails belong to several accounts: " + ', '.join(duplicates)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_case_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), name='unique_user_email_ci'),
+        ),
+    ]
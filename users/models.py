@@ -1,6 +1,6 @@
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 from django.db import models
-from rest_framework_simplejwt.tokens import RefreshToken
+from django.db.models.functions import Lower
 
 class UserManager(BaseUserManager):
     def create_user(self, email, username, password=None, **extra_fields):
@@ -41,6 +41,12 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    class Meta:
+        constraints = [
+            # Emails differing only in case belong to the same mailbox; also serves case-insensitive lookups
+            models.UniqueConstraint(Lower('email'), name='unique_user_email_ci'),
+        ]
+
     def get_full_name(self):
        return f'{self.first_name} {self.last_name}'
 
@@ -53,8 +59,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return f"{self.first_name} | {self.email}"
     def tokens(self):
-        refresh = RefreshToken.for_user(self)
-        return {
-            'refresh': str(refresh),
-            'access': str(refresh.access_token),
-        }
+        # users.tokens needs the user model to be registered, so it cannot be imported at module level
+        from .tokens import issue_tokens
+
+        return issue_tokens(self)
@@ -0,0 +1,34 @@
+from rest_framework.pagination import CursorPagination
+from rest_framework.response import Response
+
+from core.paginators import cached_estimate_count
+
+
+class UserKeysetPagination(CursorPagination):
+    """
+    Keyset pagination over users by id, so deep pages of a large table cost the same as the first.
+
+    Unfiltered listings also report `count`, a cached estimate of the table size (see
+    core.paginators.cached_estimate_count); it is null for searches, which would need a scan.
+    """
+    ordering = 'id'
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.count = None if queryset.query.has_filters() else cached_estimate_count(queryset)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'count': self.count,
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        response_schema = super().get_paginated_response_schema(schema)
+        response_schema['properties']['count'] = {'type': 'integer', 'nullable': True}
+        return response_schema
@@ -7,6 +7,9 @@ from django.core.mail import send_mail
 from django.contrib.auth.password_validation import validate_password
 import logging
 from django.urls import reverse
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.db.models.functions import Lower
 from django.contrib.auth import authenticate
 logger = logging.getLogger(__name__)
 User = get_user_model()
@@ -22,24 +25,47 @@ class RegisterSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['username', 'email', 'password', 'first_name', 'last_name']
-
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            logger.warning(f"Attempt to register with existing email: {value}")
-            raise serializers.ValidationError('A user with this email already exists.')
-        return value
+        # Uniqueness is enforced by the database constraints and mapped back to field errors in create()
+        extra_kwargs = {
+            'username': {'validators': []},
+            'email': {'validators': []},
+        }
 
     def create(self, validated_data):
-        user = User.objects.create_user(
-            username=validated_data['username'],
-            email=validated_data['email'],
-            password=validated_data['password'],
-            first_name=validated_data.get('first_name', ''),
-            last_name=validated_data.get('last_name', ''),
-        )
-        logger.info(f"User {user.username} registered successfully")
+        try:
+            with transaction.atomic():
+                user = User.objects.create_user(
+                    username=validated_data['username'],
+                    email=validated_data['email'],
+                    password=validated_data['password'],
+                    first_name=validated_data.get('first_name', ''),
+                    last_name=validated_data.get('last_name', ''),
+                )
+        except IntegrityError:
+            raise serializers.ValidationError(self.uniqueness_errors(validated_data))
+        logger.info("User %s registered successfully", user.username)
         return user
 
+    def uniqueness_errors(self, validated_data):
+        """
+        Finds which of username and email are taken, in one query that the unique indexes serve.
+        """
+        email = User.objects.normalize_email(validated_data['email'])
+        taken = (
+            User.objects.alias(email_lower=Lower('email'))
+            .filter(Q(email_lower=email.lower()) | Q(username=validated_data['username']))
+            .values_list('username', 'email')
+        )
+        errors = {}
+        for username, existing_email in taken:
+            if username == validated_data['username']:
+                errors['username'] = ['A user with that username already exists.']
+            if existing_email.lower() == email.lower():
+                errors['email'] = ['A user with this email already exists.']
+        if 'email' in errors:
+            logger.warning("Attempt to register with existing email: %s", validated_data['email'])
+        return errors or {'non_field_errors': ['Registration failed, please try again.']}
+
 class LoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
@@ -47,12 +73,12 @@ class LoginSerializer(serializers.Serializer):
     def validate(self, data):
         user = authenticate(request=self.context.get('request'), email=data['email'], password=data['password'])
         if user is None:
-            logger.warning(f"Failed login attempt for email: {data['email']}")
+            logger.warning("Failed login attempt for email: %s", data['email'])
             raise serializers.ValidationError('Invalid login credentials')
         if not user.is_active:
-            logger.warning(f"Login attempt for inactive user: {data['email']}")
+            logger.warning("Login attempt for inactive user: %s", data['email'])
             raise serializers.ValidationError('User is inactive')
-        logger.info(f"User {data['email']} logged in successfully")
+        logger.info("User %s logged in successfully", data['email'])
         return user
 
 class PasswordResetSerializer(serializers.Serializer):
@@ -60,7 +86,7 @@ class PasswordResetSerializer(serializers.Serializer):
 
     def validate_email(self, value):
         if not User.objects.filter(email=value).exists():
-            logger.warning(f"Password reset requested for non-existent email: {value}")
+            logger.warning("Password reset requested for non-existent email: %s", value)
             raise serializers.ValidationError('No user associated with this email.')
         return value
 
@@ -76,7 +102,7 @@ class PasswordResetSerializer(serializers.Serializer):
         message = f'Click the link below to reset your password:\n\n{reset_link}'
 
         send_mail(subject, message, 'noreply@example.com', [user.email], fail_silently=False)
-        logger.info(f"Password reset email sent to {user.email}")
+        logger.info("Password reset email sent to %s", user.email)
 
 class PasswordResetConfirmSerializer(serializers.Serializer):
     new_password = serializers.CharField(write_only=True)
@@ -88,11 +114,11 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
             uid = urlsafe_base64_decode(data['uidb64']).decode()
             self.user = User.objects.get(pk=uid)
         except (TypeError, ValueError, OverflowError, User.DoesNotExist):
-            logger.error(f"Invalid token or user ID during password reset.")
+            logger.error("Invalid token or user ID during password reset.")
             raise serializers.ValidationError('Invalid token or user ID')
 
         if not PasswordResetTokenGenerator().check_token(self.user, data['token']):
-            logger.warning(f"Invalid or expired token for user ID {uid}")
+            logger.warning("Invalid or expired token for user ID %s", uid)
             raise serializers.ValidationError('Invalid or expired token')
 
         return data
@@ -100,4 +126,4 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
     def save(self):
         self.user.set_password(self.validated_data['new_password'])
         self.user.save()
-        logger.info(f"Password reset successfully for user {self.user.email}")
+        logger.info("Password reset successfully for user %s", self.user.email)
@@ -1,3 +1,133 @@
-from django.test import TestCase
+from django.test import override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken
 
-# Create your tests here.
+from core.testing import CacheIsolatedTestCase
+from .models import User
+from .tokens import ClaimsJWTAuthentication, outstanding_tokens
+
+
+@override_settings(IDEMPOTENCY_KEYS=True)
+class RegisterIdempotencyTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+
+    def test_signup_retry_does_not_rerun_registration(self):
+        payload = {'username': 'alice', 'email': 'alice@example.com', 'password': 'a-Strong-pass-42'}
+        first = self.client.post('/api/v1/signup/', payload, format='json', HTTP_IDEMPOTENCY_KEY='signup-1')
+        retry = self.client.post('/api/v1/signup/', payload, format='json', HTTP_IDEMPOTENCY_KEY='signup-1')
+
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(retry.status_code, 201)
+        self.assertEqual(retry['Idempotent-Replayed'], 'true')
+        self.assertEqual(User.objects.count(), 1)
+
+
+class UserListTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_user(email="admin@example.com", username="admin", password="pass", is_staff=True)
+        for name in ('alice', 'albert', 'bob'):
+            User.objects.create_user(email=f"{name}@example.com", username=name, password="pass")
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def test_keyset_pages_with_cached_count(self):
+        first = self.client.get('/api/v1/users/', {'page_size': 2})
+        self.assertEqual([user['username'] for user in first.data['results']], ['admin', 'alice'])
+        self.assertEqual(first.data['count'], 4)
+        self.assertNotIn('password', first.data['results'][0])
+
+        with self.assertNumQueries(1):
+            second = self.client.get(first.data['next'])
+        self.assertEqual([user['username'] for user in second.data['results']], ['albert', 'bob'])
+        self.assertEqual(second.data['count'], 4)
+
+    def test_search_matches_email_or_username_prefix(self):
+        response = self.client.get('/api/v1/users/', {'search': 'al'})
+        self.assertEqual({user['username'] for user in response.data['results']}, {'alice', 'albert'})
+        self.assertIsNone(response.data['count'])
+
+
+class RegisterUniquenessTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        User.objects.create_user(email="alice@example.com", username="alice", password="pass")
+        self.client = APIClient()
+
+    def signup(self, **overrides):
+        payload = {'username': 'newcomer', 'email': 'newcomer@example.com', 'password': 'a-Strong-pass-42', **overrides}
+        return self.client.post('/api/v1/signup/', payload, format='json')
+
+    def test_signup_runs_no_uniqueness_queries(self):
+        # savepoint, insert, release
+        with self.assertNumQueries(3):
+            self.assertEqual(self.signup().status_code, 201)
+
+    def test_email_uniqueness_ignores_case(self):
+        response = self.signup(email='Alice@Example.com')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.data), ['email'])
+
+    def test_reports_every_taken_field(self):
+        response = self.signup(username='alice', email='ALICE@example.com')
+        self.assertEqual(set(response.data), {'username', 'email'})
+
+
+class TokenServiceTests(CacheIsolatedTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = User.objects.create_user(email="alice@example.com", username="alice", password="pass", is_staff=True)
+        self.client = APIClient()
+        self.addCleanup(outstanding_tokens.flush)
+
+    def test_login_defers_outstanding_token(self):
+        response = self.client.post('/api/v1/login/', {'email': 'alice@example.com', 'password': 'pass'}, format='json')
+        self.assertFalse(OutstandingToken.objects.exists())
+
+        self.assertEqual(outstanding_tokens.flush(), 1)
+        self.assertEqual(OutstandingToken.objects.get().token, response.data['tokens']['refresh'])
+
+    def test_access_token_claims_replace_user_lookup(self):
+        bob = User.objects.create_user(email="bob@example.com", username="bob", password="pass")
+        token = AccessToken(bob.tokens()['access'])
+        with self.assertNumQueries(0):
+            user = ClaimsJWTAuthentication().get_user(token)
+        self.assertEqual((user.pk, user.username, user.is_staff), (bob.pk, "bob", False))
+
+    def test_staff_tokens_are_checked_against_the_database(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.user.tokens()['access']}")
+        self.assertEqual(self.client.get('/api/v1/users/').status_code, 200)
+
+        User.objects.filter(pk=self.user.pk).update(is_staff=False)
+        self.assertEqual(self.client.get('/api/v1/users/').status_code, 403)
+        User.objects.filter(pk=self.user.pk).update(is_staff=True, is_active=False)
+        self.assertEqual(self.client.get('/api/v1/users/').status_code, 401)
+
+    def test_deactivating_or_deleting_a_user_revokes_their_tokens(self):
+        bob = User.objects.create_user(email="bob@example.com", username="bob", password="pass")
+        token = AccessToken(bob.tokens()['access'])
+        bob.is_active = False
+        bob.save()
+        with self.assertRaises(AuthenticationFailed):
+            ClaimsJWTAuthentication().get_user(token)
+
+        bob.delete()
+        with self.assertRaises(AuthenticationFailed):
+            ClaimsJWTAuthentication().get_user(token)
+
+    def test_refresh_rotates_and_blacklists(self):
+        refresh = self.user.tokens()['refresh']
+        first = self.client.post('/api/v1/auth/login/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('refresh', first.data)
+
+        replay = self.client.post('/api/v1/auth/login/refresh/', {'refresh': refresh}, format='json')
+        self.assertEqual(replay.status_code, 401)
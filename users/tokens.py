@@ -0,0 +1,248 @@
+"""
+Token service for the users app.
+
+Tokens carry `username` and `is_staff` claims, so ClaimsJWTAuthentication can build
+request.user without a database lookup for regular users. Staff tokens are still checked
+against the database on every request, so a deactivated, deleted or demoted admin loses
+access at once. Regular users who are deactivated or deleted get a revocation stamp in the
+cache (revoke_tokens) and their older tokens go back to the database lookup, which rejects
+them; the stamp reaches every worker only with a shared cache, and queryset.update() skips
+it. Otherwise claims catch up at the next refresh, at most ACCESS_TOKEN_LIFETIME later;
+refreshes re-read the user and embed the current values.
+
+With the blacklist app installed, simplejwt inserts an OutstandingToken row for every token
+it issues. Issued tokens are queued instead and written in bulk once the request that issued
+them has finished, when the queue holds TOKEN_OUTSTANDING_BATCH_SIZE tokens or its oldest
+entry is TOKEN_OUTSTANDING_FLUSH_INTERVAL seconds old, and at interpreter exit. Blacklisting
+does not depend on the queue: it creates the outstanding row on demand.
+"""
+import atexit
+import logging
+import threading
+import time
+
+from django.contrib.auth import get_user_model
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, IntegrityError, router, transaction
+from rest_framework import serializers
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken, Token
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+logger = logging.getLogger(__name__)
+
+CLAIM_FIELDS = ('username', 'is_staff')
+
+
+def revocation_key(user_id):
+    return f"tokens:revoked:{user_id}"
+
+
+def revoke_tokens(user_id):
+    """
+    Makes the claims of every token issued to a user so far unusable; they are checked against the database instead.
+
+    The stamp only has to outlive the access tokens it covers.
+    """
+    cache.set(
+        revocation_key(user_id), int(time.time()),
+        timeout=int(api_settings.ACCESS_TOKEN_LIFETIME.total_seconds()) + 1,
+    )
+
+
+def revoke_tokens_of_inactive_user(sender, instance, **kwargs):
+    """
+    `post_save` receiver: a deactivated user's tokens stop bypassing the database.
+    """
+    if not instance.is_active:
+        revoke_tokens(instance.pk)
+
+
+def revoke_tokens_of_deleted_user(sender, instance, **kwargs):
+    """
+    `post_delete` receiver: a deleted user's tokens stop bypassing the database.
+    """
+    revoke_tokens(instance.pk)
+
+
+class OutstandingTokenQueue:
+    """
+    Thread-safe buffer of OutstandingToken rows waiting to be bulk inserted.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.pending = []
+        self.oldest = None
+
+    def add(self, token):
+        row = OutstandingToken(
+            user_id=get_user_model()._meta.pk.to_python(token[api_settings.USER_ID_CLAIM]),
+            jti=token[api_settings.JTI_CLAIM], token=str(token),
+            created_at=token.current_time, expires_at=datetime_from_epoch(token['exp']),
+        )
+        with self.lock:
+            if not self.pending:
+                self.oldest = time.monotonic()
+            self.pending.append(row)
+
+    def is_due(self):
+        with self.lock:
+            return bool(self.pending) and (
+                len(self.pending) >= settings.TOKEN_OUTSTANDING_BATCH_SIZE
+                or time.monotonic() - self.oldest >= settings.TOKEN_OUTSTANDING_FLUSH_INTERVAL
+            )
+
+    def flush(self):
+        """
+        Writes every queued row; rows already created by a blacklist call are skipped, and so
+        are rows of users deleted since their token was issued.
+
+        Returns:
+        int: The number of rows flushed.
+        """
+        with self.lock:
+            pending, self.pending = self.pending, []
+        if not pending:
+            return 0
+        existing = set(
+            get_user_model().objects.filter(pk__in={row.user_id for row in pending}).values_list('pk', flat=True)
+        )
+        rows = [row for row in pending if row.user_id in existing]
+        OutstandingToken.objects.bulk_create(rows, batch_size=settings.TOKEN_OUTSTANDING_BATCH_SIZE, ignore_conflicts=True)
+        return len(rows)
+
+
+outstanding_tokens = OutstandingTokenQueue()
+atexit.register(outstanding_tokens.flush)
+
+
+def flush_outstanding_tokens(**kwargs):
+    """
+    `request_finished` receiver that flushes the queue once it is due, after the response was sent.
+    """
+    if outstanding_tokens.is_due():
+        try:
+            outstanding_tokens.flush()
+        except DatabaseError:
+            # The response is already sent; losing the bookkeeping rows must not fail the request
+            logger.exception("Could not flush outstanding tokens")
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token with embedded user claims whose outstanding row is queued instead of inserted.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        # Token.for_user, skipping BlacklistMixin's synchronous OutstandingToken insert
+        token = Token.for_user.__func__(cls, user)
+        token.set_user_claims(user)
+        outstanding_tokens.add(token)
+        return token
+
+    def set_user_claims(self, user):
+        for field in CLAIM_FIELDS:
+            self[field] = getattr(user, field)
+
+
+def issue_tokens(user):
+    """
+    Issues a refresh/access token pair for a user.
+
+    Parameters:
+    user (User): The user the tokens are issued to.
+
+    Returns:
+    dict: A dictionary containing the refresh and access tokens.
+    """
+    refresh = ClaimsRefreshToken.for_user(user)
+    return {
+        'refresh': str(refresh),
+        'access': str(refresh.access_token),
+    }
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken
+
+
+class ClaimsTokenRefreshSerializer(serializers.Serializer):
+    """
+    Rotates a refresh token with one user read, one blacklist write and no outstanding-token insert.
+    """
+    refresh = serializers.CharField()
+    access = serializers.CharField(read_only=True)
+
+    def validate(self, attrs):
+        refresh = ClaimsRefreshToken(attrs['refresh'])
+        user = (
+            get_user_model().objects.filter(**{api_settings.USER_ID_FIELD: refresh[api_settings.USER_ID_CLAIM]})
+            .only(api_settings.USER_ID_FIELD, 'is_active', *CLAIM_FIELDS).first()
+        )
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed("No active account found for the given token.", 'no_active_account')
+
+        refresh.set_user_claims(user)
+        data = {'access': str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                self.blacklist(refresh)
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            outstanding_tokens.add(refresh)
+            data['refresh'] = str(refresh)
+        return data
+
+    def blacklist(self, refresh):
+        jti = refresh[api_settings.JTI_CLAIM]
+        try:
+            with transaction.atomic():
+                # The token's outstanding row may still be queued; insert it unless it exists
+                OutstandingToken.objects.bulk_create([OutstandingToken(
+                    user_id=refresh[api_settings.USER_ID_CLAIM], jti=jti, token=str(refresh),
+                    created_at=refresh.current_time, expires_at=datetime_from_epoch(refresh['exp']),
+                )], ignore_conflicts=True)
+                BlacklistedToken.objects.create(token=OutstandingToken.objects.only('pk').get(jti=jti))
+        except IntegrityError:
+            # A concurrent refresh with the same token blacklisted it first
+            raise InvalidToken("Token is blacklisted")
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that builds request.user from the token's claims instead of a query.
+
+    The user is a regular User instance with only id, username, is_staff and is_active
+    loaded; other fields are fetched on first access. Staff tokens, tokens issued without the
+    claims and tokens issued before the user's revocation stamp fall back to the database
+    lookup, which rejects inactive and deleted users and reads the current is_staff.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN or not all(field in validated_token for field in CLAIM_FIELDS) \
+                or validated_token['is_staff']:
+            return super().get_user(validated_token)
+        try:
+            user_id = self.user_model._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, ValueError):
+            raise InvalidToken("Token contained no recognizable user identification")
+        revoked_at = cache.get(revocation_key(user_id))
+        if revoked_at is not None and validated_token.get('iat', 0) <= revoked_at:
+            return super().get_user(validated_token)
+        loaded = {
+            self.user_model._meta.pk.attname: user_id, 'is_active': True,
+            **{field: validated_token[field] for field in CLAIM_FIELDS},
+        }
+        # from_db takes the values of a partial row in the model's field order
+        field_names = [field.attname for field in self.user_model._meta.concrete_fields if field.attname in loaded]
+        return self.user_model.from_db(
+            router.db_for_read(self.user_model), field_names, [loaded[name] for name in field_names],
+        )
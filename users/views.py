@@ -10,10 +10,14 @@ from .serializers import (
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import APIException
 from django.contrib.auth import get_user_model,authenticate
+from django.db.models import Q
 from rest_framework import generics, permissions
 from rest_framework.permissions import IsAdminUser
 from .models import User
+from .pagination import UserKeysetPagination
 from .serializers import UserSerializer
+from .tokens import issue_tokens
+from core.idempotency import idempotent
 
 
 User = get_user_model()
@@ -30,6 +34,13 @@ class RegisterView(generics.CreateAPIView):
     queryset = User.objects.all()
     serializer_class = RegisterSerializer
 
+    @idempotent
+    def post(self, request, *args, **kwargs):
+        """
+        Handles the POST request for registration; retries carrying the same Idempotency-Key replay the first response.
+        """
+        return super().post(request, *args, **kwargs)
+
 
 class LoginView(views.APIView):
     """
@@ -64,11 +75,7 @@ class LoginView(views.APIView):
         APIException: If token generation fails.
         """
         try:
-            refresh = RefreshToken.for_user(user)
-            return {
-                'refresh': str(refresh),
-                'access': str(refresh.access_token),
-            }
+            return issue_tokens(user)
         except Exception as e:
             raise APIException(detail='Token generation failed')
 
@@ -141,15 +148,36 @@ class UserListView(generics.ListAPIView):
     This view is responsible for listing all users (Admin only).
     It uses a ListAPIView from Django REST Framework, which automatically handles GET requests.
 
+    Pages are keyset-paginated by id and `?search=` matches an email or username prefix,
+    which the unique indexes on both columns can serve.
+
     Attributes:
-    queryset: The queryset of all User objects.
+    queryset: The queryset of all User objects, limited to the serialized columns.
     serializer_class: The serializer class used for serializing user data.
+    pagination_class: Keyset pagination with a cached total-count estimate.
     permission_classes: The permission classes required for accessing this view. In this case, only admin users can access it.
     """
-    queryset = User.objects.all()
+    queryset = User.objects.only(*UserSerializer.Meta.fields)
     serializer_class = UserSerializer
+    pagination_class = UserKeysetPagination
     permission_classes = [IsAdminUser]  # Only accessible by admin users
 
+    def get_queryset(self):
+        """
+        This method narrows the users to an email or username prefix when `?search=` is given.
+
+        Parameters:
+        None
+
+        Returns:
+        QuerySet: A QuerySet of User objects.
+        """
+        queryset = super().get_queryset()
+        search = self.request.query_params.get('search', '').strip()
+        if search:
+            queryset = queryset.filter(Q(email__startswith=search) | Q(username__startswith=search))
+        return queryset
+
 
 class UserDetailView(generics.RetrieveAPIView):
     """
@@ -157,11 +185,11 @@ class UserDetailView(generics.RetrieveAPIView):
     It uses a RetrieveAPIView from Django REST Framework, which automatically handles GET requests.
 
     Attributes:
-    queryset: The queryset of all User objects.
+    queryset: The queryset of all User objects, limited to the serialized columns.
     serializer_class: The serializer class used for serializing user data.
     permission_classes: The permission classes required for accessing this view. In this case, only admin users can access it.
     """
-    queryset = User.objects.all()
+    queryset = User.objects.only(*UserSerializer.Meta.fields)
     serializer_class = UserSerializer
     permission_classes = [IsAdminUser]  # Only accessible by admin users
 